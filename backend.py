@@ -0,0 +1,307 @@
+import os
+import sys
+import subprocess
+import threading
+from control import ControlClient
+from events import is_reset
+from listener import create_listener
+
+# Line the backend prints on stdout once its port is bound
+READY_PREFIX = "STREAM_TOOL_READY"
+READY_TIMEOUT = 10.0
+
+
+def server_command(port):
+    if getattr(sys, 'frozen', False):
+        return [os.path.join(sys._MEIPASS, 'server.exe'), str(port)]
+    return ["node", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.js'), str(port)]
+
+
+class Backend:
+    """One server.js process with its control client and WebSocket listener.
+
+    Port 0 lets the backend pick a free port; the real one is read from its
+    ready line. Calls queued with when_ready() run once the listener
+    exists, or their on_failed once the backend has failed to start. All callbacks go through dispatch, i.e. on the UI thread.
+    listener_factory takes create_listener()'s arguments; the pipeline
+    mode passes one that listens in its worker process instead.
+    """
+
+    def __init__(self, port, message_callback, status_callback, dispatch, on_ready=None, on_failed=None,
+                 listener_factory=create_listener):
+        self.port = port
+        self.message_callback = message_callback
+        self.status_callback = status_callback
+        self.dispatch = dispatch
+        self.on_ready = on_ready or (lambda backend: None)
+        self.on_failed = on_failed or (lambda backend: None)
+        self.listener_factory = listener_factory
+        self.control = ControlClient(port, dispatch=dispatch)
+        self.process = None
+        self.listener = None
+        self.ready = False
+        self.channels = {}  # platform -> channel this backend is connected to
+        self.pending = []  # (call, on_failed) pairs waiting for the ready line
+
+    @property
+    def connected(self):
+        return bool(self.listener and self.listener.connected)
+
+    def start(self):
+        try:
+            self.process = subprocess.Popen(server_command(self.port), stdout=subprocess.PIPE, text=True,
+                                            encoding="utf-8", errors="replace", bufsize=1)
+        except Exception as e:
+            print("Failed to start server:", e)
+            self.on_failed(self)
+            return False
+
+        print("Waiting for server to start...")
+        threading.Thread(target=self._watch_output, args=(self.process,), daemon=True).start()
+        timer = threading.Timer(READY_TIMEOUT, self.dispatch, args=(self._check_ready, self.process))
+        timer.daemon = True
+        timer.start()
+        return True
+
+    def _watch_output(self, proc):
+        # Runs on its own thread: echo the backend's log and watch for its ready line
+        for line in proc.stdout:
+            if line.startswith(READY_PREFIX):
+                self.dispatch(self._on_ready, proc, int(line.split()[1]))
+            else:
+                print(line, end="")
+        self.dispatch(self._on_exit, proc)
+
+    def _on_ready(self, proc, port):
+        if proc is not self.process:
+            return  # A process we have since replaced
+        self.ready = True
+        self.port = self.control.port = port
+        print("Server started successfully on port", port)
+        self.listener = self.listener_factory(port=port, message_callback=self.message_callback,
+                                              status_callback=self.status_callback)
+        self.on_ready(self)
+        pending, self.pending = self.pending, []
+        for call, _ in pending:
+            call()
+
+    def _on_exit(self, proc):
+        if proc is self.process and not self.ready:
+            self.process = None
+            print("Server exited before becoming ready")
+            self.on_failed(self)
+
+    def _check_ready(self, proc):
+        if proc is self.process and not self.ready:
+            proc.terminate()
+            self.process = None
+            print("Server failed to start within timeout period")
+            self.on_failed(self)
+
+    def when_ready(self, call, on_failed=None):
+        if self.ready:
+            call()
+        elif self.process is None:
+            # Failed already (start() can fail before it returns) or stopped
+            if on_failed:
+                on_failed(ConnectionError(f"Backend on port {self.port or 'auto'} is not running"))
+        else:
+            self.pending.append((call, on_failed))
+
+    def fail_pending(self, error):
+        """Give up on the calls still waiting: on_failed(error) for each."""
+        pending, self.pending = self.pending, []
+        for _, on_failed in pending:
+            if on_failed:
+                on_failed(error)
+
+    def stop(self, wait=False):
+        self.pending = []  # (call, on_failed) pairs waiting for the ready line
+        if self.listener:
+            self.listener.disconnect()
+            self.listener = None
+        self.control.close()
+        if self.process:
+            self.process.terminate()
+            if wait:
+                self.process.wait(timeout=5)
+            self.process = None
+        self.ready = False
+
+
+class ResetFilter:
+    """Decides which backends' clearViewers get passed on, by backend port.
+
+    expect() is called with the connected backends right before a keyword
+    broadcast: only the first of their resets is forwarded. expect_late()
+    marks a backend that was just told an existing keyword; its reset is
+    dropped. forward() runs on listener threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._awaiting = set()
+        self._forwarded = False
+        self._late = set()
+
+    def expect(self, ports):
+        with self._lock:
+            self._awaiting = set(ports)
+            self._forwarded = False
+
+    def expect_late(self, port):
+        with self._lock:
+            self._late.add(port)
+
+    def forward(self, port):
+        with self._lock:
+            if port in self._late:
+                self._late.discard(port)
+                return False
+            if port in self._awaiting:
+                self._awaiting.discard(port)
+                if self._forwarded:
+                    return False
+                self._forwarded = True
+            return True
+
+
+class BackendPool:
+    """Spreads channels over as many server.js processes as they need.
+
+    server.js holds one connection per platform, so a backend serves at
+    most one TikTok and one Twitch channel. The first backend listens on
+    the configured port; further ones are started on free ports whenever
+    every existing backend already serves a channel of the requested
+    platform. All listeners feed the same
+    message_callback, so one ingestion queue and one ViewerStore dedupe
+    viewers across backends.
+
+    Setting or clearing the keyword makes every backend send clearViewers.
+    Only the first of those is passed on: a later one would wipe viewers
+    the faster backends have already accepted under the new keyword.
+    reset_filter makes that call; it is the worker's in pipeline mode,
+    where the events never reach this process.
+    """
+
+    def __init__(self, message_callback, status_callback, dispatch, on_ready=None, on_failed=None,
+                 listener_factory=create_listener, reset_filter=None):
+        self.message_callback = message_callback
+        self.status_callback = status_callback
+        self.dispatch = dispatch
+        self.on_ready = on_ready
+        self.on_failed = on_failed
+        self.listener_factory = listener_factory
+        self.resets = reset_filter or ResetFilter()
+        self.backends = []
+        self.keyword = ""
+
+    def __len__(self):
+        return len(self.backends)
+
+    @property
+    def connected(self):
+        return bool(self.backends) and all(backend.connected for backend in self.backends)
+
+    def restart(self, port):
+        """Replace every backend with a single fresh one on port."""
+        self.stop()
+        self._spawn(port)
+
+    def _spawn(self, port=0):
+        backend = Backend(port, None, None, self.dispatch, self._on_backend_ready, self._on_backend_failed,
+                          self.listener_factory)
+        backend.message_callback = lambda event: self._on_event(backend, event)
+        backend.status_callback = lambda message, color: self.status_callback(backend, message, color)
+        self.backends.append(backend)
+        backend.start()
+        return backend
+
+    def _on_backend_ready(self, backend):
+        # A backend started after the keyword was set needs it too; the
+        # clearViewers that answers it must not wipe the others' viewers
+        if self.keyword:
+            self.resets.expect_late(backend.port)
+            backend.control.set_keyword(self.keyword)
+        if self.on_ready:
+            self.on_ready(backend)
+
+    def _on_backend_failed(self, backend):
+        # Its channels' /start calls never ran; report them, or the caller waits forever
+        backend.fail_pending(ConnectionError(f"Backend on port {backend.port or 'auto'} failed to start"))
+        if backend in self.backends:
+            self.backends.remove(backend)
+            backend.stop()
+        if self.on_failed:
+            self.on_failed(backend)
+
+    def _on_event(self, backend, event):
+        # Listener thread
+        if is_reset(event) and not self.resets.forward(backend.port):
+            return
+        self.message_callback(event)
+
+    def _expect_reset(self):
+        self.resets.expect(backend.port for backend in self.backends if backend.connected)
+
+    def connect(self, platform, channels, callback=None):
+        """Connect platform to exactly these channels, starting backends as
+        needed; callback(channel, response, error) runs once per channel."""
+        callback = callback or (lambda channel, response, error: None)
+        channels = list(dict.fromkeys(channels))  # A repeat would start the same channel twice
+        for backend in self.backends:
+            if backend.channels.get(platform) not in (None, *channels):
+                backend.control.disconnect(platform)
+                del backend.channels[platform]
+
+        for channel in channels:
+            backend = (next((b for b in self.backends if b.channels.get(platform) == channel), None)
+                       or next((b for b in self.backends if platform not in b.channels), None)
+                       or self._spawn())
+            backend.channels[platform] = channel
+            backend.when_ready(lambda backend=backend, channel=channel: backend.control.start(
+                channel, platform, callback=lambda response, error: callback(channel, response, error)),
+                lambda error, channel=channel: callback(channel, None, error))
+
+    def disconnect(self, platform):
+        for backend in self.backends:
+            if backend.channels.pop(platform, None) is not None:
+                backend.control.disconnect(platform)
+
+    def _broadcast(self, send, callback):
+        # callback(ok, error) once every ready backend has answered
+        backends = [backend for backend in self.backends if backend.ready]
+        if not backends:
+            if callback:
+                callback(False, ConnectionError("No backend is running"))
+            return
+        results = []
+
+        def on_result(response, error):
+            results.append(error or (None if response.ok else RuntimeError(response.text)))
+            if len(results) == len(backends) and callback:
+                errors = [e for e in results if e]
+                callback(not errors, errors[0] if errors else None)
+
+        for backend in backends:
+            send(backend.control, on_result)
+
+    def set_keyword(self, keyword, callback=None):
+        self.keyword = keyword
+        self._expect_reset()
+        self._broadcast(lambda control, on_result: control.set_keyword(keyword, callback=on_result), callback)
+
+    def clear_keyword(self, callback=None):
+        self.keyword = ""
+        self._expect_reset()
+        self._broadcast(lambda control, on_result: control.clear_keyword(callback=on_result), callback)
+
+    def retry(self):
+        for backend in self.backends:
+            if backend.listener:
+                backend.listener.retry_connection()
+
+    def stop(self, wait=False):
+        backends, self.backends = self.backends, []
+        for backend in backends:
+            backend.stop(wait=wait)
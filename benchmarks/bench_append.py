@@ -0,0 +1,53 @@
+"""Per-append and redraw cost of ViewerList at growing list sizes.
+
+Run from the repo root (needs a display):  python benchmarks/bench_append.py
+The per-append and per-frame columns should stay flat from 100 to 500k
+names, and the Tk text size should stay at one screenful.
+"""
+import os
+import sys
+import time
+import tracemalloc
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gui import ViewerList
+
+SIZES = (100, 1000, 10000, 100000, 500000)
+SAMPLE = 200  # Appends timed at each size
+
+
+def main():
+    root = tk.Tk()
+    root.withdraw()
+    viewer_list = ViewerList(root, height=10, width=50)
+
+    print(f"{'viewers':>10} {'us/append':>12} {'ms/frame':>10} {'model MB':>10} {'tk chars':>10}")
+    for size in SIZES:
+        viewer_list.clear()
+        tracemalloc.start()
+        viewer_list.append_entries([(f"viewer{i}", "tiktok") for i in range(size)])
+        model_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for i in range(SAMPLE):
+            viewer_list.append_entries([(f"late{i}", "twitch")])
+            viewer_list.see_end()
+        per_append = (time.perf_counter() - start) / SAMPLE
+
+        start = time.perf_counter()
+        for i in range(SAMPLE):
+            viewer_list.scroll_to((i * 7919) % viewer_list.row_count)
+            root.update_idletasks()
+        per_frame = (time.perf_counter() - start) / SAMPLE
+
+        tk_chars = len(viewer_list.text.get("1.0", tk.END))
+        print(f"{size:>10} {per_append * 1e6:>12.1f} {per_frame * 1e3:>10.2f} "
+              f"{model_bytes / 1e6:>10.1f} {tk_chars:>10}")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Write throughput and startup replay time of ViewerJournal.
+
+Run from the repo root:  python benchmarks/bench_journal.py [viewers]
+Replay has to stay well under a second at 1M viewers so a restart after a
+crash doesn't stall the window.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from journal import ViewerJournal
+from viewer_store import ViewerStore
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    platforms = ("tiktok", "twitch")
+    # One name in a thousand needs escaping, roughly what live chat sees
+    names = [f"viewer {i:07d}" if i % 1000 else f"Viewer\t{i}" for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "viewers.journal")
+        store = ViewerStore()
+        journal = ViewerJournal(path).open()
+        start = time.perf_counter()
+        for batch_start in range(0, count, 500):
+            for i in range(batch_start, min(batch_start + 500, count)):
+                store.add(names[i], platforms[i & 1])
+            journal.on_viewers(store, batch_start)
+        journal.close()
+        written = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        restored = ViewerStore()
+        start = time.perf_counter()
+        rows = ViewerJournal(path).replay(restored)
+        replayed = time.perf_counter() - start
+        # Mode indexes are built the first time a mode is shown, not on replay
+        start = time.perf_counter()
+        restored.mode_rows("sanitized")
+        indexed = time.perf_counter() - start
+
+        assert rows == count and restored.names == store.names and restored.first_words == store.first_words
+
+    print(f"viewers        {count}")
+    print(f"journal size   {size / 1e6:.1f} MB")
+    print(f"add + write    {written * 1e3:.0f} ms")
+    print(f"replay         {replayed * 1e3:.0f} ms")
+    print(f"first mode     {indexed * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
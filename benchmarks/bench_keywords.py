@@ -0,0 +1,68 @@
+"""KeywordEngine against trying every keyword's regex in turn.
+
+Run from the repo root:  python benchmarks/bench_keywords.py [keywords] [messages]
+The engine needs to stay well above 10k msgs/sec with 50+ keywords to keep
+up with a busy multi-giveaway stream; both results are checked to agree.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keywords import KeywordEngine, compile_keyword
+
+WORDS = ["giveaway", "pick me", "me", "hi", "hello", "yes", "win", "lucky", "enter", "join",
+         "i'm in", "let's go", "gg", "wow", "love it", "🔥", "🎉", "go!", "me please", "ok"]
+CHATTER = ["lol", "what is this", "first time here", "anyone from brazil?", "😂😂😂",
+           "this song slaps", "how do i enter", "good morning chat", "W", "ratio"]
+
+
+def make_keywords(count, rng):
+    keywords = list(WORDS)
+    while len(keywords) < count:
+        keywords.append(f"{rng.choice(WORDS).rstrip('!')}{len(keywords)}")
+    return keywords[:count]
+
+
+def make_messages(count, keywords, rng):
+    messages = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            keyword = rng.choice(keywords)
+            # Repeated letters and trailing punctuation/emoji, as chat does it
+            message = "".join(c * rng.choice((1, 1, 2, 3)) if c.isalpha() else c for c in keyword)
+            message += rng.choice(("", "!", "!!", "?", "🎉", "!🔥🔥"))
+        else:
+            message = rng.choice(CHATTER)
+        messages.append(message)
+    return messages
+
+
+def main():
+    keyword_count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    message_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    rng = random.Random(7)
+    keywords = make_keywords(keyword_count, rng)
+    messages = make_messages(message_count, keywords, rng)
+
+    patterns = [(keyword, compile_keyword(keyword)) for keyword in keywords]
+    engine = KeywordEngine(keywords)
+
+    start = time.perf_counter()
+    naive = [[k for k, p in patterns if p.match(m)] for m in messages]
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    routed = [engine.match(m) for m in messages]
+    engine_time = time.perf_counter() - start
+
+    mismatches = sum(sorted(a) != sorted(b) for a, b in zip(naive, routed))
+    hits = sum(len(matched) for matched in routed)
+    print(f"{keyword_count} keywords, {message_count} messages, {hits} keyword hits, {mismatches} mismatches")
+    print(f"{'every regex':<14} {message_count / naive_time:>12.0f} msgs/sec")
+    print(f"{'KeywordEngine':<14} {message_count / engine_time:>12.0f} msgs/sec")
+
+
+if __name__ == "__main__":
+    main()
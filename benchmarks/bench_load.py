@@ -0,0 +1,225 @@
+"""End-to-end load test: fake backend -> listener -> ingest queue -> compiler.
+
+Run from the repo root:
+    python benchmarks/bench_load.py --rate 2000 --duration 10
+    python benchmarks/bench_load.py --rate 20000 --listener threaded
+    python benchmarks/bench_load.py --replay chat.ndjson --rate 500
+    python benchmarks/bench_load.py --rate 20000 --pipeline
+
+Chat is paced at --rate events/s, --batch events per frame; --replay takes
+NDJSON lines with viewerName/platform/message instead of synthetic
+nicknames. The ingest queue is drained every 16ms from a plain thread,
+standing in for the Tk loop. With --pipeline the listener, queue and
+dedupe run in the ViewerPipeline worker process instead, and that thread
+only applies the rows it ships. As in the GUI on a non-raw view, every
+mode's index then exists before the first rows arrive; the run checks
+they still count what a fresh index would.
+
+Latency is from the moment a viewer's first frame is sent to the moment the
+compiler hands the new row to its consumers (what the GUI renders from).
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compiler import ViewerCompiler, ViewerConsumer
+from ingest import IngestQueue, POLICIES, DROP_NEWEST
+from listener import create_listener
+from pipeline import ViewerPipeline
+from stats import stats
+from timeseries import StreamTrends
+from viewer_store import ViewerStore, INDEXED_MODES
+from fake_backend import FakeBackend, synthetic_chat
+
+TICK = 0.01  # Sender pacing granularity, seconds
+
+
+class LatencyProbe(ViewerConsumer):
+    def __init__(self, sent_at):
+        self.sent_at = sent_at
+        self.latencies = []
+
+    def on_viewers(self, store, start):
+        now = time.perf_counter()
+        for name in store.names[start:]:
+            sent = self.sent_at.get(name)
+            if sent is not None:
+                self.latencies.append(now - sent)
+
+
+def check_mode_counts(store):
+    # Mode indexes kept up to date row by row must match ones built afresh
+    fresh = ViewerStore()
+    fresh.load(store.names, store.platforms, store.sanitized, store.first_words, store.first_seen)
+    for mode in INDEXED_MODES:
+        assert store.unique_count(mode) == fresh.unique_count(mode), mode
+
+
+def check_pipeline_rows(pipeline):
+    """Rows shipped into an empty store land in the mode indexes already
+    built, as update_count() builds them after every clear."""
+    store = pipeline.compiler.store
+    for mode in INDEXED_MODES:
+        assert store.unique_count(mode) == 0
+    names = ["Alice", "Bob"]
+    pipeline.handle(("rows", 0, names, bytes((1, 2)), names, names, array('d', (0.0, 0.0)).tobytes()))
+    for mode in INDEXED_MODES:
+        assert store.unique_count(mode) == 2, mode
+    pipeline.compiler.clear()
+    for mode in INDEXED_MODES:
+        store.unique_count(mode)
+
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_events(args):
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        return itertools.islice(itertools.cycle(events), int(args.rate * args.duration))
+    return synthetic_chat(int(args.rate * args.duration), args.unique_ratio)
+
+
+class AfterLoop:
+    """Just enough of Tk's after() for ViewerPipeline, run on one thread."""
+
+    def __init__(self):
+        self.calls = []
+        self.order = itertools.count()
+
+    def after(self, ms, func, *args):
+        heapq.heappush(self.calls, (time.perf_counter() + ms / 1000, next(self.order), func, args))
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run(self, stop):
+        while not stop.is_set():
+            if self.calls and self.calls[0][0] <= time.perf_counter():
+                _, _, func, args = heapq.heappop(self.calls)
+                func(*args)
+            else:
+                time.sleep(0.001)
+
+
+def drain(ingest_queue, compiler, stop):
+    # Stand-in for the Tk after() loop
+    while not stop.is_set():
+        batch = ingest_queue.take()
+        if batch:
+            compiler.handle_batch(batch)
+        else:
+            time.sleep(ingest_queue.interval_ms / 1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end ingestion load test")
+    parser.add_argument("--rate", type=float, default=2000, help="chat events per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of chat to send")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="distinct viewers / frames")
+    parser.add_argument("--replay", help="NDJSON file of recorded chat events")
+    parser.add_argument("--listener", choices=("async", "threaded"), default="async")
+    parser.add_argument("--batch", type=int, default=1, help="chat events per frame (JSON array if > 1)")
+    parser.add_argument("--policy", choices=POLICIES, default=DROP_NEWEST, help="ingest queue overload policy")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--pipeline", action="store_true", help="run the listener and dedupe in a worker process")
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend().start()
+    rss_before = rss_mb()
+
+    compiler = ViewerCompiler()
+    sent_at = {}
+    probe = LatencyProbe(sent_at)
+    compiler.add_consumer(probe)
+    stop = threading.Event()
+    pipeline = None
+    if args.pipeline:
+        loop = AfterLoop()
+        pipeline = ViewerPipeline(loop, compiler, StreamTrends(), maxsize=args.queue_size, policy=args.policy)
+        check_pipeline_rows(pipeline)
+        pipeline.start()
+        ingest_queue = pipeline.queue
+        ws_manager = pipeline.listener(backend.port)
+        threading.Thread(target=loop.run, args=(stop,), daemon=True).start()
+    else:
+        ingest_queue = IngestQueue(root=None, batch_callback=compiler.handle_batch,
+                                   maxsize=args.queue_size, policy=args.policy)
+        threading.Thread(target=drain, args=(ingest_queue, compiler, stop), daemon=True).start()
+        ws_manager = create_listener(backend.port, ingest_queue.put, lambda message, color: None,
+                                     use_asyncio=args.listener == "async")
+    if not backend.wait_for_client():
+        sys.exit("listener never connected to the fake backend")
+
+    events = load_events(args)
+    per_tick = max(1, int(args.rate * TICK))
+    sent = 0
+    start = time.perf_counter()
+    while True:
+        chunk = list(itertools.islice(events, per_tick))
+        if not chunk:
+            break
+        now = time.perf_counter()
+        for event in chunk:
+            sent_at.setdefault(event["viewerName"].strip(), now)
+        backend.send_chat(chunk, args.batch)
+        sent += len(chunk)
+        delay = start + sent / args.rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    send_elapsed = time.perf_counter() - start
+
+    # Let the pipeline catch up, then give it a moment to go quiet
+    deadline = time.perf_counter() + 30
+    frames = -(-sent // args.batch)
+    while ws_manager.messages_received < frames and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    while len(ingest_queue) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.1)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    ws_manager.disconnect()
+    if pipeline:
+        pipeline.stop()
+    backend.stop()
+    if pipeline:
+        check_mode_counts(compiler.store)
+
+    latencies = probe.latencies
+    print(f"listener          {args.listener}{' in worker process' if args.pipeline else ''}")
+    print(f"events sent       {sent} in {send_elapsed:.2f}s ({sent / send_elapsed:.0f}/s)")
+    print(f"frames received   {ws_manager.messages_received} ({ws_manager.messages_received / elapsed:.0f}/s)")
+    print(f"queue drops       {ingest_queue.dropped} ({args.policy})")
+    print(f"coalesced         {ingest_queue.shed['coalesced']}")
+    print(f"viewers accepted  {len(compiler.store)}")
+    print(f"latency p50       {percentile(latencies, 0.50) * 1e3:.1f} ms")
+    print(f"latency p99       {percentile(latencies, 0.99) * 1e3:.1f} ms")
+    print(f"peak RSS          {rss_mb():.0f} MB (+{rss_mb() - rss_before:.0f} MB)")
+    print()
+    print(f"{'stage':<12}{'calls':>9}{'mean ms':>10}{'p99 ms':>10}")
+    for stage, histogram in sorted(stats.stages.items()):
+        snap = histogram.snapshot()
+        print(f"{stage:<12}{snap['count']:>9}{snap['mean_ms']:>10.3f}{snap['p99_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""sanitize.py against the original per-character implementation.
+
+Run from the repo root:  python benchmarks/bench_sanitize.py
+"""
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sanitize
+from fake_backend import NICKNAMES
+
+
+def reference_sanitize(name):
+    # The implementation UsernameCompiler.sanitize_name used to carry
+    cleaned = ''.join(
+        c if unicodedata.category(c).startswith('L') or c.isspace() else ' '
+        for c in unicodedata.normalize('NFKC', name)
+    )
+    return re.sub(r'\s+', ' ', cleaned).strip()
+
+
+def make_names(count, distinct):
+    rng = random.Random(1)
+    pool = [f"{rng.choice(NICKNAMES)}{i}" for i in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def timed(label, func, names):
+    start = time.perf_counter()
+    func(names)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e3:>9.1f} ms  {elapsed / len(names) * 1e9:>8.0f} ns/name")
+
+
+def main():
+    names = make_names(200000, distinct=50000)
+    for name in set(names):
+        assert sanitize.sanitize_name(name) == reference_sanitize(name), name
+    sanitize.sanitize_name.cache_clear()
+
+    print(f"{len(names)} names, {len(set(names))} distinct")
+    timed("reference", lambda ns: [reference_sanitize(n) for n in ns], names)
+    timed("uncached fast path", lambda ns: [sanitize._sanitize_uncached(n) for n in ns], names)
+    timed("sanitize_names (cold)", sanitize.sanitize_names, names)
+    timed("sanitize_names (warm)", sanitize.sanitize_names, names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Per-keystroke latency of ViewerSearch over a large viewer list.
+
+Run from the repo root:  python benchmarks/bench_search.py [viewers]
+Types a few queries one character at a time, as the search box does, then
+backspaces over the last one, and checks every result against a plain scan
+of the store. Queries are limited to the latest --limit hits, as the GUI
+does (0: no limit).
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from viewer_store import ViewerStore
+from search import ViewerSearch, PREFIX, SUBSTRING
+from fake_backend import NICKNAMES
+
+
+def scan(store, query, mode, platform):
+    query = query.casefold()
+    rows = []
+    for row in range(len(store)):
+        if platform and store.platform(row) != platform:
+            continue
+        for text in (store.names[row], store.sanitized[row]):
+            text = text.casefold()
+            if text.startswith(query) if mode == PREFIX else query in text:
+                rows.append(row)
+                break
+    return rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(1)
+    store = ViewerStore()
+    for i in range(count):
+        store.add(f"{rng.choice(NICKNAMES)}{i}", rng.choice(("tiktok", "twitch")))
+
+    search = ViewerSearch(store)
+    start = time.perf_counter()
+    search.on_viewers(store, 0)
+    print(f"chunk {count} viewers: {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    search.build_index()
+    print(f"index {count} viewers: {time.perf_counter() - start:.2f}s (in idle slices in the GUI)")
+
+    typing = []
+    for query, mode, platform in (("john_doe", SUBSTRING, None), ("mary", PREFIX, "twitch"),
+                                  ("ｆｕｌｌ", PREFIX, None), ("42", SUBSTRING, None),
+                                  ("doe4242", SUBSTRING, None), ("jane_smith99", PREFIX, None)):
+        typing += [(query[:length], mode, platform) for length in range(1, len(query) + 1)]
+    # Backspace: every query is new, none narrows the one before
+    typing += [(query[:length], mode, platform) for length in range(len(query) - 1, 0, -1)]
+    for typed, mode, platform in typing:
+        start = time.perf_counter()
+        rows = search.search(typed, mode, platform=platform, limit=limit or None)
+        elapsed = time.perf_counter() - start
+        expected = scan(store, typed, mode, platform)
+        assert rows == (expected[-limit:] if limit else expected), typed
+        print(f"{mode:9} {platform or 'all':6} {typed!r:15} {len(expected):7} hits  {elapsed * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Memory and speed of ViewerStore at multi-million viewer sessions.
+
+Run from the repo root:  python benchmarks/bench_store.py [viewers]
+"bytes/viewer" excludes the raw name strings themselves, which the caller
+already owns; it is the cost of keeping a viewer in the store, with every
+dedupe mode's index built.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from viewer_store import ViewerStore, INDEXED_MODES
+
+
+def indexed_store():
+    store = ViewerStore()
+    for mode in INDEXED_MODES:
+        store.mode_rows(mode)
+    return store
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    names = [f"viewer {i:07d}" if i % 3 else f"Viewer{i}" for i in range(count)]
+    platforms = ("tiktok", "twitch")
+
+    store = indexed_store()
+    tracemalloc.start()
+    for i, name in enumerate(names):
+        store.add(name, platforms[i & 1])
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    store = indexed_store()
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        store.add(name, platforms[i & 1])
+    elapsed = time.perf_counter() - start
+
+    probes = names[::97]
+    start = time.perf_counter()
+    for name in probes:
+        name in store
+    lookup = (time.perf_counter() - start) / len(probes)
+
+    start = time.perf_counter()
+    store.clear()
+    cleared = time.perf_counter() - start
+
+    print(f"viewers        {count}")
+    print(f"add            {elapsed / count * 1e9:.0f} ns/viewer")
+    print(f"lookup         {lookup * 1e9:.0f} ns")
+    print(f"bytes/viewer   {used / count:.0f}")
+    print(f"clear          {cleared * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
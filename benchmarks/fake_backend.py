@@ -0,0 +1,227 @@
+"""Stand-in for server.js for benchmarks and soak runs.
+
+Speaks the same protocol on one port: the WebSocket the GUI listens on
+(chat frames, 'clearViewers', control frames) plus the HTTP control
+endpoints (/start, /keyword, /clearKeyword, /forwardChat, /disconnect,
+/health). Stdlib only, so it runs anywhere the tool itself runs.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import threading
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Shapes of nicknames seen in TikTok/Twitch chat
+NICKNAMES = [
+    "john_doe", "xXGamerXx", "Mary Jane", "cool.cat", "user",
+    "🌸 Sakura 🌸", "💀skull💀", "🔥FireQueen🔥", "✨ star ✨ light ✨",
+    "𝓑𝓮𝓵𝓵𝓪", "𝕯𝖆𝖗𝖐 𝕶𝖓𝖎𝖌𝖍𝖙", "ᴍɪɴɪ ᴍᴇ", "Ｆｕｌｌｗｉｄｔｈ",
+    "李小龙", "さくら🌸", "김민수", "Даша", "Zoë Ångström", "José María",
+]
+PLATFORM_COLORS = {"tiktok": "#00b400", "twitch": "#9146ff"}
+
+
+def synthetic_chat(count, unique_ratio=0.5, keyword="giveaway", seed=1):
+    """count chat events drawn from count * unique_ratio distinct viewers."""
+    rng = random.Random(seed)
+    distinct = max(1, int(count * unique_ratio))
+    for _ in range(count):
+        i = rng.randrange(distinct)
+        platform = "tiktok" if i % 3 else "twitch"
+        yield {"viewerName": f"{NICKNAMES[i % len(NICKNAMES)]}{i}", "platform": platform, "message": keyword}
+
+
+def encode_frame(text, opcode=0x1):
+    payload = text.encode("utf-8")
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, "big")
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, "big")
+    return header + payload
+
+
+class FakeBackend:
+    """Runs on its own asyncio loop thread; all public methods are thread-safe."""
+
+    def __init__(self, port=0):
+        self.port = port
+        self.keyword = ""
+        self.requests = []  # (method, path, body) of every HTTP call
+        self.clients = set()
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_server(), self.loop).result()
+        return self
+
+    async def _start_server(self):
+        self.server = await asyncio.start_server(self._handle, "localhost", self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._stop_server(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    async def _stop_server(self):
+        self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        await self.server.wait_closed()
+
+    def drop_clients(self):
+        """Force-close every WebSocket, like a backend restart; returns once
+        they are gone, so wait_for_client() then waits for a reconnect."""
+        async def close_all():
+            for writer in list(self.clients):
+                self.clients.discard(writer)
+                writer.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self.loop).result()
+
+    def send(self, texts):
+        """Send each text as one frame to every connected client."""
+        data = b"".join(encode_frame(text) for text in texts)
+        self.loop.call_soon_threadsafe(self._write, data)
+
+    def send_chat(self, events, batch=1):
+        """Send chat events, batch of them per frame as a JSON array when batch > 1."""
+        payloads = [{"type": "chat", "color": PLATFORM_COLORS.get(e["platform"], ""), **e} for e in events]
+        if batch > 1:
+            self.send([json.dumps(payloads[i:i + batch]) for i in range(0, len(payloads), batch)])
+        else:
+            self.send([json.dumps(payload) for payload in payloads])
+
+    def wait_for_client(self, timeout=10):
+        for _ in range(int(timeout * 100)):
+            if self.clients:
+                return True
+            threading.Event().wait(0.01)
+        return False
+
+    def _write(self, data):
+        for writer in list(self.clients):
+            if not writer.is_closing():
+                writer.write(data)
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get("upgrade", "").lower() == "websocket":
+            await self._websocket(reader, writer, headers)
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            await self._http(writer, method, path, body)
+
+    async def _websocket(self, reader, writer, headers):
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        self.clients.add(writer)
+        try:
+            while True:
+                first, second = await reader.readexactly(2)
+                length = second & 0x7F
+                if length == 126:
+                    length = int.from_bytes(await reader.readexactly(2), "big")
+                elif length == 127:
+                    length = int.from_bytes(await reader.readexactly(8), "big")
+                mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length)))
+                opcode = first & 0x0F
+                if opcode == 0x8:  # Close
+                    writer.write(b"\x88\x00")
+                    break
+                if opcode == 0x9:  # Ping
+                    writer.write(bytes((0x8A, len(payload))) + payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _http(self, writer, method, path, body):
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            data = {}
+        self.requests.append((method, path, data))
+
+        status, payload = 200, {"success": True}
+        if path == "/health":
+            payload = {"status": "ok"}
+        elif path == "/start":
+            if not data.get("username") or not data.get("platform"):
+                status, payload = 400, {"success": False, "error": "Missing username or platform"}
+        elif path == "/keyword":
+            self.keyword = (data.get("keyword") or "").strip()
+            self._write(encode_frame(json.dumps({"type": "control", "action": "clearViewers"})))
+        elif path == "/clearKeyword":
+            self.keyword = ""
+            self._write(encode_frame("clearViewers"))
+        elif path not in ("/disconnect", "/shutdown", "/forwardChat"):
+            status, payload = 404, {"success": False, "error": "Not found"}
+
+        content = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode() + content)
+        await writer.drain()
+        writer.close()
+
+
+def main():
+    """Run standalone in place of server.js: python benchmarks/fake_backend.py [port] [--rate N]
+
+    Prints the same ready line server.js does, so BackendPool and the GUI
+    can be pointed at it, then sends rate keyword hits per second (from
+    viewers unique to this process) while a client is connected.
+    """
+    import argparse
+    import os
+    import time
+    parser = argparse.ArgumentParser()
+    parser.add_argument("port", type=int, nargs="?", default=0)
+    parser.add_argument("--rate", type=float, default=0)
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.port).start()
+    print(f"STREAM_TOOL_READY {backend.port}", flush=True)
+    sent = 0
+    try:
+        while True:
+            time.sleep(0.1)
+            if args.rate and backend.clients:
+                count = max(1, int(args.rate / 10))
+                backend.send_chat([{"viewerName": f"{NICKNAMES[(sent + i) % len(NICKNAMES)]} {os.getpid()}-{sent + i}",
+                                    "message": backend.keyword or "giveaway", "platform": "twitch"}
+                                   for i in range(count)], batch=count)
+                sent += count
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Soak test: hours of simulated stream through the ingestion path, watching
+for anything that keeps growing.
+
+Run from the repo root:
+    python benchmarks/soak.py --hours 8 --speed 200
+    python benchmarks/soak.py --hours 2 --speed 100 --gui --csv soak.csv
+
+A fake backend sends --chat-rate keyword hits per stream second, --speed
+stream seconds per real second, through the listener, the ingest queue and
+the compiler into the GUI's consumers (search index, journal, trends).
+Every --keyword-minutes of stream time the keyword changes, which makes the
+backend send clearViewers; every --reconnect-minutes it drops its clients
+and the listener is told to reconnect, as the Reconnect button does. With
+--gui the list is rendered into a real ViewerList on a hidden Tk window and
+its tag ranges are counted; otherwise a plain thread drains the queue.
+
+Resources are sampled each time the list is reset, when it is empty again,
+so whatever grows from one keyword to the next is a leak. The run fails
+(exit status 1) when RSS or the thread count grows past its budget between
+the first and last of those samples, the Tk tag count ever exceeds its
+budget, or any sample's p99 latency exceeds its budget.
+"""
+import argparse
+import csv
+import itertools
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compiler import ViewerCompiler, ViewerConsumer
+from control import ControlClient
+from ingest import IngestQueue
+from journal import ViewerJournal
+from listener import create_listener
+from search import ViewerSearch
+from timeseries import StreamTrends
+from bench_load import LatencyProbe, percentile, TICK
+from fake_backend import FakeBackend, synthetic_chat
+
+SAMPLE_FIELDS = ["elapsed_s", "stream_hours", "event", "viewers", "rss_mb", "threads", "tk_tags",
+                 "queue_depth", "dropped", "reconnects", "p50_ms", "p99_ms"]
+
+
+def rss_mb():
+    """Current resident set size; falls back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ListRenderer(ViewerConsumer):
+    """What the GUI does with new rows, minus the rest of the window."""
+
+    def __init__(self, view):
+        self.view = view
+
+    def on_viewers(self, store, start):
+        self.view.append_entries([(store.names[i], store.platform(i)) for i in range(start, len(store))])
+        self.view.see_end()
+
+    def on_clear(self):
+        self.view.clear()
+
+
+class Monitor(ViewerConsumer):
+    """Takes the samples; runs on the thread that consumes the queue."""
+
+    def __init__(self, soak, out=None):
+        self.soak = soak
+        self.samples = []
+        self.resets = []
+        self.max_tags = 0
+        self.writer = csv.DictWriter(out, SAMPLE_FIELDS) if out else None
+        if self.writer:
+            self.writer.writeheader()
+
+    def on_clear(self):
+        self.resets.append(self.sample("reset"))
+
+    def sample(self, event="tick"):
+        soak = self.soak
+        latencies, soak.probe.latencies = soak.probe.latencies, []
+        tags = soak.tag_count()
+        self.max_tags = max(self.max_tags, tags or 0)
+        row = {
+            "elapsed_s": round(time.perf_counter() - soak.started, 1),
+            "stream_hours": round(soak.stream_seconds / 3600, 2),
+            "event": event,
+            "viewers": len(soak.compiler.store),
+            "rss_mb": round(rss_mb(), 1),
+            "threads": threading.active_count(),
+            "tk_tags": tags,
+            "queue_depth": len(soak.queue),
+            "dropped": soak.queue.dropped,
+            "reconnects": soak.reconnects,
+            "p50_ms": round(percentile(latencies, 0.50) * 1e3, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1e3, 1),
+        }
+        self.samples.append(row)
+        if self.writer:
+            self.writer.writerow(row)
+        return row
+
+
+class Soak:
+    def __init__(self, args, out=None):
+        self.args = args
+        self.backend = FakeBackend().start()
+        self.control = ControlClient(self.backend.port)
+        self.compiler = ViewerCompiler()
+        self.sent_at = {}
+        self.probe = LatencyProbe(self.sent_at)
+        self.trends = StreamTrends()
+        self.journal = ViewerJournal(os.path.join(tempfile.mkdtemp(prefix="soak-"), "viewers.journal"))
+        self.journal.open()
+        self.search = ViewerSearch(self.compiler.store)
+        for consumer in (self.search, self.journal, self.probe):
+            self.compiler.add_consumer(consumer)
+        self.root = self.view = None
+        if args.gui:
+            import tkinter as tk
+            from gui import ViewerList
+            self.root = tk.Tk()
+            self.root.withdraw()
+            self.view = ViewerList(self.root, height=10, width=50, bg='white')
+            self.view.pack()
+            self.compiler.add_consumer(ListRenderer(self.view))
+        self.monitor = Monitor(self, out)
+        self.compiler.add_consumer(self.monitor)
+        self.queue = IngestQueue(self.root, self.handle_batch)
+        self.listener = None
+        self.started = time.perf_counter()
+        self.stream_seconds = 0.0
+        self.reconnects = 0
+        self.done = threading.Event()
+
+    def handle_batch(self, events):
+        self.trends.handle_batch(events)
+        self.compiler.handle_batch(events)
+
+    def tag_count(self):
+        if not self.view:
+            return None
+        text = self.view.text
+        return sum(len(text.tag_ranges(tag)) // 2 for tag in text.tag_names())
+
+    def run(self):
+        self.listener = create_listener(self.backend.port, self.queue.put, lambda message, color: None,
+                                        use_asyncio=self.args.listener == "async")
+        if not self.backend.wait_for_client():
+            sys.exit("listener never connected to the fake backend")
+        threading.Thread(target=self.drive, name="soak-driver", daemon=True).start()
+        if self.root:
+            self.queue.start()
+            self.root.after(int(self.args.sample_seconds * 1000), self.tick)
+            self.root.after(100, self.check_done)
+            self.root.after(30, self.index_search)
+            self.root.mainloop()
+        else:
+            self.drain()
+        self.listener.disconnect()
+        self.journal.close()
+        self.control.close()
+        self.backend.stop()
+
+    def drain(self):
+        # Stand-in for the Tk after() loop
+        next_sample = time.perf_counter() + self.args.sample_seconds
+        while not self.done.is_set():
+            batch = self.queue.take()
+            if batch:
+                self.handle_batch(batch)
+            elif not self.search.build_index(0.01):
+                self.queue.wait(self.queue.interval_ms / 1000)
+            if time.perf_counter() >= next_sample:
+                self.monitor.sample()
+                next_sample += self.args.sample_seconds
+
+    def tick(self):
+        self.monitor.sample()
+        self.root.after(int(self.args.sample_seconds * 1000), self.tick)
+
+    def index_search(self):
+        # As the GUI does while idle
+        self.search.build_index(0.01)
+        self.root.after(30, self.index_search)
+
+    def check_done(self):
+        if self.done.is_set():
+            self.root.quit()
+        else:
+            self.root.after(100, self.check_done)
+
+    def drive(self):
+        # Sender thread: chat at the accelerated rate, with keyword changes
+        # and forced reconnects on the stream clock
+        args = self.args
+        rate = args.chat_rate * args.speed
+        per_tick = max(1, int(rate * TICK))
+        keyword_every = args.keyword_minutes * 60
+        reconnect_every = args.reconnect_minutes * 60
+        next_keyword, next_reconnect = keyword_every, reconnect_every
+        total = args.hours * 3600
+        cycle = 0
+        events = synthetic_chat(10 ** 12, args.unique_ratio, seed=cycle)
+        sent = 0
+        start = time.perf_counter()
+        while self.stream_seconds < total:
+            chunk = list(itertools.islice(events, per_tick))
+            now = time.perf_counter()
+            for event in chunk:
+                self.sent_at.setdefault(event["viewerName"].strip(), now)
+            self.backend.send_chat(chunk, args.batch)
+            sent += len(chunk)
+            self.stream_seconds = sent / args.chat_rate
+
+            if self.stream_seconds >= next_reconnect:
+                next_reconnect += reconnect_every
+                self.backend.drop_clients()
+                self.listener.retry_connection()
+                self.backend.wait_for_client()
+                self.reconnects += 1
+            # After any reconnect, so the clearViewers isn't sent into a dropped socket
+            if self.stream_seconds >= next_keyword:
+                next_keyword += keyword_every
+                cycle += 1
+                # Names from before the reset may be accepted again, so time them afresh
+                self.sent_at = self.probe.sent_at = {}
+                self.control.set_keyword(f"keyword{cycle}").result()
+                events = synthetic_chat(10 ** 12, args.unique_ratio, seed=cycle)
+
+            delay = start + sent / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        time.sleep(1)  # Let the pipeline catch up
+        self.done.set()
+
+
+def check(monitor, args):
+    """Budget violations, as messages."""
+    failures = []
+    resets = monitor.resets[1:]  # The first reset lands before anything has warmed up
+    if len(resets) >= 2:
+        first, last = resets[0], resets[-1]
+        growth = last["rss_mb"] - first["rss_mb"]
+        if growth > args.rss_budget_mb:
+            failures.append(f"RSS grew {growth:.1f} MB across {len(resets)} resets (budget {args.rss_budget_mb} MB)")
+        growth = last["threads"] - first["threads"]
+        if growth > args.thread_budget:
+            failures.append(f"thread count grew by {growth} across {len(resets)} resets (budget {args.thread_budget})")
+    else:
+        print("warning: fewer than 3 resets, growth not checked; run longer or lower --keyword-minutes")
+    if monitor.max_tags > args.tag_budget:
+        failures.append(f"Tk tag ranges reached {monitor.max_tags} (budget {args.tag_budget})")
+    worst = max((sample["p99_ms"] for sample in monitor.samples if sample["p99_ms"] == sample["p99_ms"]), default=0)
+    if worst > args.latency_budget_ms:
+        failures.append(f"p99 latency reached {worst:.0f} ms (budget {args.latency_budget_ms} ms)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Long-running soak and leak test")
+    parser.add_argument("--hours", type=float, default=8, help="stream hours to simulate")
+    parser.add_argument("--speed", type=float, default=200, help="stream seconds per real second")
+    parser.add_argument("--chat-rate", type=float, default=20, help="keyword hits per stream second")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="distinct viewers / hits")
+    parser.add_argument("--batch", type=int, default=1, help="chat events per frame")
+    parser.add_argument("--keyword-minutes", type=float, default=30, help="stream minutes between keyword changes")
+    parser.add_argument("--reconnect-minutes", type=float, default=10, help="stream minutes between forced reconnects")
+    parser.add_argument("--listener", choices=("async", "threaded"), default="async")
+    parser.add_argument("--gui", action="store_true", help="render into a hidden Tk ViewerList (needs a display)")
+    parser.add_argument("--sample-seconds", type=float, default=5, help="real seconds between timeline samples")
+    parser.add_argument("--csv", help="write every sample to this CSV file")
+    parser.add_argument("--rss-budget-mb", type=float, default=50)
+    parser.add_argument("--thread-budget", type=int, default=2)
+    parser.add_argument("--tag-budget", type=int, default=1000)
+    parser.add_argument("--latency-budget-ms", type=float, default=1000)
+    args = parser.parse_args(argv)
+
+    out = open(args.csv, "w", newline="") if args.csv else None
+    try:
+        soak = Soak(args, out)
+        soak.run()
+    finally:
+        if out:
+            out.close()
+
+    monitor = soak.monitor
+    print(f"{'stream h':>9}{'RSS MB':>9}{'threads':>9}{'tags':>7}{'p99 ms':>9}   (at each reset)")
+    for sample in monitor.resets:
+        print(f"{sample['stream_hours']:>9.2f}{sample['rss_mb']:>9.1f}"
+              f"{sample['threads']:>9}{sample['tk_tags'] if sample['tk_tags'] is not None else '-':>7}"
+              f"{sample['p99_ms']:>9.1f}")
+    print(f"reconnects {soak.reconnects}, dropped {soak.queue.dropped}, "
+          f"elapsed {time.perf_counter() - soak.started:.0f}s")
+    failures = check(monitor, args)
+    for failure in failures:
+        print("FAIL:", failure)
+    if failures:
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
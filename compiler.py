@@ -0,0 +1,79 @@
+import time
+from events import is_reset
+from viewer_store import ViewerStore
+from stats import stats as shared_stats, DEDUPE, STORE
+
+
+class ViewerConsumer:
+    """Something that follows the compiled viewer list.
+
+    on_viewers(store, start) is called after rows start.. were appended to
+    the store; on_clear() after the list was reset.
+    """
+
+    def on_viewers(self, store, start):
+        pass
+
+    def on_clear(self):
+        pass
+
+
+class ViewerCompiler:
+    """Display-free ingestion core shared by the GUI and headless mode.
+
+    Takes batches of listener events, dedupes accepted viewers into a
+    ViewerStore and notifies the registered consumers once per batch.
+    """
+
+    def __init__(self, store=None, stats=None):
+        self.store = store if store is not None else ViewerStore()
+        self.consumers = []
+        self.stats = stats or shared_stats
+
+    def add_consumer(self, consumer):
+        self.consumers.append(consumer)
+
+    def remove_consumer(self, consumer):
+        self.consumers.remove(consumer)
+
+    def handle_batch(self, events):
+        # Stage times are summed over the batch and recorded once per batch
+        clock = time.perf_counter
+        dedupe_time = store_time = 0.0
+        first_new = len(self.store)
+        for event in events:
+            if event.type == "chat":
+                nickname = event.viewer_name
+                if nickname:
+                    start = clock()
+                    seen = nickname in self.store
+                    checked = clock()
+                    dedupe_time += checked - start
+                    if not seen:
+                        self.store.add(nickname, event.platform)
+                        store_time += clock() - checked
+            elif is_reset(event):
+                self.clear()
+                first_new = 0
+
+        self.stats.incr("events_ingested", len(events))
+        self.stats.incr("viewers_accepted", len(self.store) - first_new)
+        self.stats.observe(DEDUPE, dedupe_time)
+        self.stats.observe(STORE, store_time)
+        self.notify(first_new)
+
+    def add(self, name, platform=""):
+        start = len(self.store)
+        if name:
+            self.store.add(name, platform)
+        self.notify(start)
+
+    def notify(self, start):
+        if start < len(self.store):
+            for consumer in self.consumers:
+                consumer.on_viewers(self.store, start)
+
+    def clear(self):
+        self.store.clear()
+        for consumer in self.consumers:
+            consumer.on_clear()
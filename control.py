@@ -0,0 +1,68 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) seconds; /start can legitimately take the server's full 5s
+DEFAULT_TIMEOUT = (2, 10)
+
+
+class ControlClient:
+    """Non-blocking client for the backend's HTTP control endpoints.
+
+    Requests run on a small worker pool over one pooled requests.Session,
+    so repeated calls reuse sockets. Each call takes an optional
+    callback(response, error) which is handed to dispatch() so it runs on
+    the UI thread rather than the worker.
+    """
+
+    def __init__(self, port, dispatch=None, max_workers=4, timeout=DEFAULT_TIMEOUT):
+        self.port = port
+        self.dispatch = dispatch or (lambda func, *args: func(*args))
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="control")
+
+    @property
+    def base_url(self):
+        return f"http://localhost:{self.port}"
+
+    def request(self, method, path, payload=None, callback=None):
+        """Queue an HTTP call; returns the Future of the response."""
+        def call():
+            return self.session.request(method, self.base_url + path, json=payload,
+                                        timeout=self.timeout)
+
+        future = self.executor.submit(call)
+        if callback:
+            future.add_done_callback(lambda f: self._finish(f, callback))
+        return future
+
+    def _finish(self, future, callback):
+        try:
+            self.dispatch(callback, future.result(), None)
+        except Exception as e:
+            self.dispatch(callback, None, e)
+
+    def start(self, username, platform, callback=None):
+        return self.request("POST", "/start", {"username": username, "platform": platform}, callback)
+
+    def disconnect(self, platform, callback=None):
+        return self.request("POST", "/disconnect", {"platform": platform}, callback)
+
+    def set_keyword(self, keyword, callback=None):
+        return self.request("POST", "/keyword", {"keyword": keyword}, callback)
+
+    def set_chat_forwarding(self, enabled, callback=None):
+        return self.request("POST", "/forwardChat", {"enabled": enabled}, callback)
+
+    def clear_keyword(self, callback=None):
+        return self.request("POST", "/clearKeyword", callback=callback)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,108 @@
+import json
+
+# Plain-text frames server.js sends outside of JSON
+TEXT_CONTROL_FRAMES = ('clearViewers', 'disconnect')
+
+
+def _text(value):
+    """A frame field as a str that encodes as UTF-8: other JSON values are
+    converted, and a lone surrogate (a JS string cut mid-emoji) becomes "?"."""
+    if isinstance(value, str):
+        if value.isascii():
+            return value
+    elif value is None:
+        return ""
+    else:
+        value = str(value)
+    return value.encode("utf-8", "replace").decode("utf-8")
+
+
+class ChatEvent:
+    """A keyword hit forwarded by the backend."""
+    __slots__ = ("viewer_name", "platform", "message", "color")
+    type = "chat"
+
+    def __init__(self, viewer_name, platform="", message="", color=""):
+        self.viewer_name = viewer_name
+        self.platform = platform
+        self.message = message
+        self.color = color
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(_text(data.get("viewerName")).strip(), _text(data.get("platform")),
+                   _text(data.get("message")), _text(data.get("color")))
+
+    def __repr__(self):
+        return f"ChatEvent({self.viewer_name!r}, {self.platform!r})"
+
+
+class ChatMessageEvent(ChatEvent):
+    """Any chat line, forwarded when the backend's chat forwarding is on."""
+    __slots__ = ()
+    type = "chatMessage"
+
+    def __repr__(self):
+        return f"ChatMessageEvent({self.viewer_name!r}, {self.message!r})"
+
+
+class ControlEvent:
+    """A control instruction such as clearViewers."""
+    __slots__ = ("action",)
+    type = "control"
+
+    def __init__(self, action):
+        self.action = action
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(_text(data.get("action")))
+
+    def __repr__(self):
+        return f"ControlEvent({self.action!r})"
+
+
+class ViewerCountEvent:
+    """Current viewer count of a platform's stream."""
+    __slots__ = ("platform", "count")
+    type = "viewerCount"
+
+    def __init__(self, platform, count):
+        self.platform = platform
+        self.count = count
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(_text(data.get("platform")), int(data.get("count") or 0))
+
+    def __repr__(self):
+        return f"ViewerCountEvent({self.platform!r}, {self.count})"
+
+
+EVENT_TYPES = {cls.type: cls for cls in (ChatEvent, ChatMessageEvent, ControlEvent, ViewerCountEvent)}
+
+
+def is_reset(event):
+    return event.type == "control" and event.action == "clearViewers"
+
+
+def decode_frame(message):
+    """Decode one WebSocket frame into a list of events.
+
+    A frame is a plain-text control word, a JSON event object or a JSON
+    array of event objects (one parse for a whole batch). Unknown event
+    types are skipped. Raises ValueError if the frame isn't valid JSON,
+    ValueError or TypeError if an event has a field it can't use.
+    """
+    if message in TEXT_CONTROL_FRAMES:
+        return [ControlEvent(message)]
+
+    data = json.loads(message)
+    items = data if isinstance(data, list) else (data,)
+    events = []
+    for item in items:
+        if isinstance(item, dict):
+            event_class = EVENT_TYPES.get(item.get("type"))
+            if event_class:
+                events.append(event_class.from_dict(item))
+    return events
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from itertools import islice
+from viewer_store import PLATFORMS
+
+# Rows written per out.write(), so a 1M-viewer export never builds one giant string
+CHUNK_SIZE = 10000
+
+
+class _TimeFormatter(dict):
+    """ISO 8601 UTC with milliseconds; the date-time part is formatted once
+    per second since consecutive viewers mostly share it."""
+
+    def __missing__(self, second):
+        text = self[second] = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        return text
+
+    def __call__(self, timestamp):
+        second = int(timestamp)
+        return f"{self[second]}.{int((timestamp - second) * 1000):03d}Z"
+
+
+class ViewerSnapshot:
+    """A store's rows as of its creation, readable from a worker thread.
+
+    Holds references to the store's columns and a copy of mode's unique
+    rows: rows appended later aren't seen, and clear() swaps in new columns
+    rather than emptying these, so the snapshot stays intact. Create it on
+    the thread that owns the store.
+    """
+
+    def __init__(self, store, mode="raw"):
+        self.mode = mode
+        self.row_numbers = store.unique_rows_from(mode)
+        self.texts = store.texts(mode)
+        self.platforms = store.platforms
+        self.first_seen = store.first_seen
+
+    def __len__(self):
+        return len(self.row_numbers)
+
+    def rows(self):
+        """(text, platform, first_seen) per exported viewer: the same unique
+        list the display mode shows."""
+        texts, platforms, first_seen = self.texts, self.platforms, self.first_seen
+        for i in self.row_numbers:
+            yield texts[i], PLATFORMS[platforms[i]], first_seen[i]
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_list(rows, out, chunk_size=CHUNK_SIZE):
+    """Comma-separated names, the format the list has always been copied in."""
+    separator = ""
+    for chunk in _chunks(rows, chunk_size):
+        out.write(separator + ", ".join(text for text, _, _ in chunk))
+        separator = ", "
+
+
+def write_csv(rows, out, chunk_size=CHUNK_SIZE):
+    # csv.writer writes row by row; buffer each chunk so out sees one write
+    format_time = _TimeFormatter()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["name", "platform", "first_seen"])
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows((text, platform, format_time(seen)) for text, platform, seen in chunk)
+        out.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def write_ndjson(rows, out, chunk_size=CHUNK_SIZE):
+    # Only the name needs JSON escaping; platforms and times are plain ASCII
+    format_time = _TimeFormatter()
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    for chunk in _chunks(rows, chunk_size):
+        out.write("".join(
+            f'{{"name": {encode(text)}, "platform": "{platform}", "first_seen": "{format_time(seen)}"}}\n'
+            for text, platform, seen in chunk
+        ))
+
+
+FORMATS = {"list": write_list, "csv": write_csv, "ndjson": write_ndjson}
+EXTENSIONS = {".txt": "list", ".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def format_for_path(path):
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), "list")
+
+
+def export_to_file(snapshot, path, fmt=None):
+    """Write snapshot to path; the format follows the extension unless given."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        FORMATS[fmt or format_for_path(path)](snapshot.rows(), f)
+
+
+def export_text(snapshot, fmt="list"):
+    out = io.StringIO()
+    FORMATS[fmt](snapshot.rows(), out)
+    return out.getvalue()
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import secrets
+import time
+from collections import namedtuple
+from viewer_store import PLATFORM_CODES
+
+DEFAULT_DRAW_LOG = os.path.join(os.path.expanduser("~"), ".stream_tool", "draws.log")
+
+# Rejection sampling gives up after this many tries per winner and falls
+# back to listing the eligible rows, e.g. when most entrants are excluded
+MAX_TRIES_PER_WINNER = 200
+
+# One draw: the seed replays it against the same list, rows index the store
+Draw = namedtuple("Draw", ["seed", "mode", "platform", "pool_size", "rows", "winners"])
+
+
+class Giveaway:
+    """Draws winners straight from a ViewerStore.
+
+    Winners are sampled uniformly without replacement from the unique rows
+    of a display mode, optionally from one platform and skipping earlier
+    winners. Picking random rows and rejecting ineligible ones costs O(N)
+    for N winners however long the list is; only a filter that rejects
+    almost everyone falls back to a scan. Every draw gets a seed (random
+    unless given), and the same seed on the same list draws the same
+    winners. Each draw is appended to log_path as one JSON line.
+    """
+
+    def __init__(self, store, log_path=DEFAULT_DRAW_LOG):
+        self.store = store
+        self.log_path = log_path
+        self.previous = set()  # Raw names of everyone drawn so far
+
+    def draw(self, count, mode="raw", platform=None, exclude_previous=True, seed=None):
+        if count < 1:
+            raise ValueError(f"Need at least one winner, got {count}")
+        store = self.store
+        seed = secrets.randbits(64) if seed is None else seed
+        rng = random.Random(seed)
+        pool = store.mode_rows(mode)  # The store's own array, not a copy
+        code = PLATFORM_CODES.get(platform, 0) if platform else None
+        platforms, names = store.platforms, store.names
+        excluded = self.previous if exclude_previous else ()
+
+        def eligible(row):
+            return (code is None or platforms[row] == code) and names[row] not in excluded
+
+        rows = []
+        if pool and (code is not None or excluded):
+            chosen = set()
+            tries = MAX_TRIES_PER_WINNER * count
+            while len(rows) < count and tries:
+                tries -= 1
+                row = pool[rng.randrange(len(pool))]
+                if row not in chosen:
+                    chosen.add(row)
+                    if eligible(row):
+                        rows.append(row)
+            if len(rows) < count:
+                rows = [row for row in pool if eligible(row)]
+                rows = rng.sample(rows, min(count, len(rows)))
+        else:
+            rows = [pool[i] for i in rng.sample(range(len(pool)), min(count, len(pool)))]
+
+        texts = store.texts(mode)
+        result = Draw(seed, mode, platform, len(pool), rows, [texts[row] for row in rows])
+        self._log(result, len(excluded))
+        self.previous.update(names[row] for row in rows)
+        return result
+
+    def reset(self):
+        """Forget earlier winners, so they can win again."""
+        self.previous = set()
+
+    def _log(self, result, excluded):
+        if not self.log_path:
+            return
+        entry = {
+            "time": time.time(),
+            "seed": result.seed,
+            "mode": result.mode,
+            "platform": result.platform,
+            "pool_size": result.pool_size,
+            "excluded": excluded,
+            "rows": result.rows,
+            "names": [self.store.names[row] for row in result.rows],
+            "winners": result.winners,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Error writing draw log: {e}")
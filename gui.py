@@ -1,31 +1,127 @@
-import sys
 import os
-import subprocess
+import argparse
 import tkinter as tk
-from tkinter import messagebox, filedialog, scrolledtext
-import requests
+from tkinter import messagebox, filedialog
+import multiprocessing
 import threading
 import time
-import unicodedata
-import re
-import json
+from ingest import IngestQueue, TkDispatcher, POLICIES, DROP_NEWEST
+from backend import BackendPool
 from listener import create_listener
-
-class UsernameCompiler:
-    def __init__(self):
+from pipeline import ViewerPipeline
+from sanitize import sanitize_name
+from compiler import ViewerCompiler, ViewerConsumer
+from viewer_store import PLATFORM_CODES
+from journal import ViewerJournal, DEFAULT_JOURNAL_PATH
+from overlay import OverlayWriter, OVERLAY_FILES
+from export import ViewerSnapshot, export_to_file, export_text
+from stats import stats, RENDER
+from timeseries import StreamTrends
+from search import ViewerSearch, PREFIX, SUBSTRING
+from giveaway import Giveaway, DEFAULT_DRAW_LOG
+
+STARTUP_T0 = time.perf_counter()
+STATS_SNAPSHOT_MS = 5000
+LOAD_INDICATOR_MS = 1000
+# The search index is built in slices of SEARCH_INDEX_BUDGET seconds, this far apart
+SEARCH_INDEX_MS = 50
+SEARCH_INDEX_BUDGET = 0.01
+
+# Display modes and the export mode that produces the same list
+DISPLAY_MODES = {"Unsanitized Names": "raw", "Sanitized Names": "sanitized", "First Word Only": "first_word",
+                 "Ignore Case": "casefold"}
+CURRENT_VIEW = "Current view"
+
+SEARCH_MODES = {"Contains": SUBSTRING, "Starts with": PREFIX}
+SEARCH_PLATFORMS = {"All platforms": None, "TikTok": "tiktok", "Twitch": "twitch"}
+# A search shows only its latest matches, so a short query costs no more than a long one
+MAX_SEARCH_HITS = 2000
+
+class UsernameCompiler(ViewerConsumer):
+    def __init__(self, measure_startup=False, stats_file=None, journal_path=None,
+                 overload_policy=DROP_NEWEST, queue_size=10000, draw_log=DEFAULT_DRAW_LOG, pipeline=False,
+                 overlay_dir=None, overlay_files=tuple(OVERLAY_FILES), overlay_interval=1.0, overlay_recent=10):
         self.root = tk.Tk()
         self.root.withdraw()  # Hide window until everything is set up
         self.root.title("Stream Tool")
         
         # Initialize instance variables
-        self.ws_manager = None
-        self.server_process = None
-        self.viewer_set = set()
-        self.nickname_map = {}
+        self.measure_startup = measure_startup
+        self.stats_file = stats_file
+        self.stats_panel = None
+        self.trends = StreamTrends()
+        self.trends_panel = None
+        self.startup_marks = {}
+        self.compiler = ViewerCompiler()
+        self.viewer_store = self.compiler.store
+        # Indexed before the list renders, so new rows are searchable right away
+        self.search = ViewerSearch(self.viewer_store)
+        self.compiler.add_consumer(self.search)
+        self.compiler.add_consumer(self)
+        self.giveaway = Giveaway(self.viewer_store, draw_log)
+        self.giveaway_panel = None
         self.current_display_mode = "Unsanitized Names"
         
         self.setup_gui()
         self.setup_event_handlers()
+
+        # Bring back the list from before a crash, then keep journaling
+        self.journal = None
+        if journal_path:
+            self.journal = ViewerJournal(journal_path)
+            restored = self.journal.replay(self.viewer_store)
+            if restored:
+                print(f"📂 Restored {restored} viewers from {journal_path}")
+                self.compiler.notify(0)
+            self.journal.open()
+            self.compiler.add_consumer(self.journal)
+
+        # Text files for an OBS overlay, kept in step with the displayed list
+        self.overlay = None
+        if overlay_dir:
+            self.overlay = OverlayWriter(overlay_dir, overlay_files, min_interval=overlay_interval,
+                                         recent_count=overlay_recent,
+                                         mode=DISPLAY_MODES[self.current_display_mode])
+            self.overlay.on_viewers(self.viewer_store, 0)
+            self.overlay.open()
+            self.compiler.add_consumer(self.overlay)
+
+        self.pipeline = None
+        if pipeline:
+            # Listening, decoding, dedupe and sanitizing all run in a worker
+            # process; this one only applies finished rows and draws
+            self.pipeline = ViewerPipeline(self.root, self.compiler, self.trends,
+                                           maxsize=queue_size, policy=overload_policy)
+            self.pipeline.start()
+            self.ingest_queue = self.pipeline.queue
+        else:
+            # Listener thread only enqueues; the Tk loop drains in batches
+            self.ingest_queue = IngestQueue(self.root, self.handle_websocket_batch,
+                                            maxsize=queue_size, policy=overload_policy)
+            self.ingest_queue.start()
+        self.root.after(LOAD_INDICATOR_MS, self.refresh_load_indicator)
+        self.root.after(SEARCH_INDEX_MS, self.build_search_index)
+
+        # Control calls run on worker threads; results come back via the dispatcher
+        self.dispatcher = TkDispatcher(self.root)
+        self.dispatcher.start()
+
+        # Every backend's listener feeds the one ingest queue, so the store
+        # dedupes across backends. In pipeline mode the listeners and the
+        # queue live in the worker, so there is nothing to feed here
+        self.backends = BackendPool(
+            message_callback=None if self.pipeline else self.ingest_queue.put,
+            status_callback=lambda backend, message, color: self.dispatcher.call(
+                self.on_listener_status, backend, message, color),
+            dispatch=self.dispatcher.call,
+            on_ready=self.on_server_ready,
+            on_failed=self.on_server_failed,
+            listener_factory=self.pipeline.listener if self.pipeline else create_listener,
+            reset_filter=self.pipeline
+        )
+
+        if self.stats_file:
+            self.root.after(STATS_SNAPSHOT_MS, self.write_stats_snapshot)
         
         # Update initial status to show attempting to connect
         self.status_label.config(text="⏳ Attempting to connect...", fg="orange")
@@ -38,8 +134,8 @@ class UsernameCompiler:
         # Set minimum size to prevent window becoming smaller than initial size
         self.root.minsize(initial_width, initial_height)
         
-        # Finish setup and show GUI after everything is ready
-        self.root.after(100, self.finish_startup)
+        # Show the GUI as soon as the loop starts, then boot the backend
+        self.root.after_idle(self.finish_startup)
 
     def setup_gui(self):
         # Create GUI components...
@@ -64,7 +160,7 @@ class UsernameCompiler:
         tiktok_column = tk.Frame(form_frame)
         tiktok_column.pack(side=tk.LEFT, padx=10)
 
-        tk.Label(tiktok_column, text="TikTok Username:").pack()
+        tk.Label(tiktok_column, text="TikTok Username(s), comma-separated:").pack()
         self.tiktok_entry = tk.Entry(tiktok_column, width=25)
         self.tiktok_entry.pack()
         self.tiktok_entry.bind("<Return>", lambda event: self.submit_username("tiktok"))
@@ -79,7 +175,7 @@ class UsernameCompiler:
         twitch_column = tk.Frame(form_frame)
         twitch_column.pack(side=tk.LEFT, padx=10)
 
-        tk.Label(twitch_column, text="Twitch Username:").pack()
+        tk.Label(twitch_column, text="Twitch Username(s), comma-separated:").pack()
         self.twitch_entry = tk.Entry(twitch_column, width=25)
         self.twitch_entry.pack()
         self.twitch_entry.bind("<Return>", lambda event: self.submit_username("twitch"))
@@ -117,20 +213,50 @@ class UsernameCompiler:
         tk.Button(name_button_frame, text="Unsanitized Names", command=self.show_unsanitized_names).pack(side=tk.LEFT, padx=5)
         tk.Button(name_button_frame, text="Sanitized Names", command=self.show_sanitized_name).pack(side=tk.LEFT, padx=5)
         tk.Button(name_button_frame, text="First Word Only", command=self.show_first_word).pack(side=tk.LEFT, padx=5)
+        tk.Button(name_button_frame, text="Ignore Case",
+                  command=lambda: self.set_display_mode("Ignore Case")).pack(side=tk.LEFT, padx=5)
 
         divider2 = tk.Frame(self.root, bg="black", height=2)
         divider2.pack(fill=tk.X, pady=10)
 
-        tk.Label(self.root, text="Viewer Names:").pack()
+        self.count_label = tk.Label(self.root, text="Viewer Names: 0")
+        self.count_label.pack()
+        self.load_label = tk.Label(self.root, text="", fg="red")
+        self.load_label.pack()
+
+        search_frame = tk.Frame(self.root)
+        search_frame.pack(pady=(0, 5))
+        tk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_entry = tk.Entry(search_frame, width=20)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<KeyRelease>", lambda event: self.apply_search())
+        self.search_mode = tk.StringVar(value="Contains")
+        tk.OptionMenu(search_frame, self.search_mode, *SEARCH_MODES,
+                      command=lambda _: self.apply_search()).pack(side=tk.LEFT)
+        self.search_platform = tk.StringVar(value="All platforms")
+        tk.OptionMenu(search_frame, self.search_platform, *SEARCH_PLATFORMS,
+                      command=lambda _: self.apply_search()).pack(side=tk.LEFT)
+        self.applied_search = ("", self.search_mode.get(), self.search_platform.get())
+        self.search_capped = False  # The list shows only the latest MAX_SEARCH_HITS matches
+
         self.viewer_text = ViewerList(self.root, height=10, width=50, bg='white')
         self.viewer_text.pack()
 
+        export_frame = tk.Frame(self.root)
+        export_frame.pack(pady=(10, 0))
+        tk.Label(export_frame, text="Copy/Save as:").pack(side=tk.LEFT)
+        self.export_mode = tk.StringVar(value=CURRENT_VIEW)
+        tk.OptionMenu(export_frame, self.export_mode, CURRENT_VIEW, *DISPLAY_MODES).pack(side=tk.LEFT, padx=5)
+
         bottom_frame = tk.Frame(self.root)
         bottom_frame.pack(pady=10)
 
         tk.Button(bottom_frame, text="Copy List", command=self.copy_list).pack(side=tk.LEFT, padx=5)
         tk.Button(bottom_frame, text="Save List", command=self.save_to_file).pack(side=tk.LEFT, padx=5)
         tk.Button(bottom_frame, text="Clear All", command=self.clear_all).pack(side=tk.LEFT, padx=5)
+        tk.Button(bottom_frame, text="Stats", command=self.show_stats).pack(side=tk.LEFT, padx=5)
+        tk.Button(bottom_frame, text="Trends", command=self.show_trends).pack(side=tk.LEFT, padx=5)
+        tk.Button(bottom_frame, text="Draw Winners", command=self.show_giveaway).pack(side=tk.LEFT, padx=5)
 
         self.retry_button = tk.Button(bottom_frame, text="Reconnect", command=self.retry_ws, state=tk.DISABLED)
         self.status_label = tk.Label(self.root, text="🔴 Not connected", anchor="center", justify="center", fg="red")
@@ -140,94 +266,129 @@ class UsernameCompiler:
     def setup_event_handlers(self):
         self.root.protocol("WM_DELETE_WINDOW", self.on_close_window)
 
-    def handle_websocket_message(self, message):
-        if message == 'clearViewers':
-            self.viewer_text.delete("1.0", tk.END)
-            self.viewer_set.clear()
-            self.nickname_map.clear()
-            self.viewer_text.original_names = []  # Reset original names
-            return
+    def handle_websocket_message(self, event):
+        self.handle_websocket_batch([event])
+
+    def handle_websocket_batch(self, events):
+        stats.gauge("queue_depth", len(self.ingest_queue))
+        stats.gauge("queue_dropped", self.ingest_queue.dropped)
+        stats.gauge("queue_coalesced", self.ingest_queue.shed["coalesced"])
+        self.trends.handle_batch(events)
+        self.compiler.handle_batch(events)
+
+    def refresh_load_indicator(self):
+        queue = self.ingest_queue
+        if queue.shedding and queue.dropped:
+            self.load_label.config(text=f"⚠️ Shedding load ({queue.policy}): {queue.dropped} events dropped, "
+                                        f"{len(queue)} queued")
+        else:
+            self.load_label.config(text="")
+        self.root.after(LOAD_INDICATOR_MS, self.refresh_load_indicator)
+
+    def build_search_index(self):
+        self.search.build_index(SEARCH_INDEX_BUDGET)
+        self.root.after(SEARCH_INDEX_MS, self.build_search_index)
 
+    def write_stats_snapshot(self):
         try:
-            data = json.loads(message)
-            if data.get("type") == "chat":
-                nickname = data.get("viewerName", "").strip()
-                platform = data.get("platform", "")
-                
-                if nickname and nickname not in self.viewer_set:
-                    self.viewer_set.add(nickname)
-                    # Store the original name and platform
-                    if not hasattr(self.viewer_text, 'original_names'):
-                        self.viewer_text.original_names = []
-                    self.viewer_text.original_names.append((nickname, platform))
-                    
-                    current_text = self.viewer_text.get("1.0", tk.END).strip()
-                    if current_text:
-                        self.viewer_text.insert(tk.END, ", ")
-                    
-                    start_index = self.viewer_text.index("end-1c")
-                    self.viewer_text.insert(tk.END, nickname)
-                    end_index = self.viewer_text.index("end-1c")
-                    
-                    if platform == "tiktok":
-                        self.viewer_text.tag_add("tiktok", start_index, end_index)
-                    elif platform == "twitch":
-                        self.viewer_text.tag_add("twitch", start_index, end_index)
-                    
-                    self.viewer_text.see(tk.END)
-                    
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+            stats.append_snapshot(self.stats_file)
+        except OSError as e:
+            print(f"Error writing stats snapshot: {e}")
+        self.root.after(STATS_SNAPSHOT_MS, self.write_stats_snapshot)
+
+    def show_stats(self):
+        if self.stats_panel and self.stats_panel.winfo_exists():
+            self.stats_panel.lift()
+        else:
+            self.stats_panel = StatsPanel(self.root)
+
+    def show_trends(self):
+        if self.trends_panel and self.trends_panel.winfo_exists():
+            self.trends_panel.lift()
+        else:
+            self.trends_panel = TrendsPanel(self.root, self.trends)
+
+    def show_giveaway(self):
+        if self.giveaway_panel and self.giveaway_panel.winfo_exists():
+            self.giveaway_panel.lift()
+        else:
+            self.giveaway_panel = GiveawayPanel(self.root, self.giveaway,
+                                                lambda: DISPLAY_MODES[self.current_display_mode])
+
+    def on_viewers(self, store, start):
+        self.show_new_viewers(start)
+
+    def on_clear(self):
+        self.viewer_text.clear()
+        self.update_count()
+
+    def update_count(self):
+        # O(1): every mode keeps its own unique-row index
+        count = self.viewer_store.unique_count(DISPLAY_MODES[self.current_display_mode])
+        if self.searching():
+            matching = self.viewer_text.entry_count
+            latest = "latest " if self.search_capped else ""
+            self.count_label.config(text=f"Viewer Names: {count} ({latest}{matching} matching)")
+        else:
+            self.count_label.config(text=f"Viewer Names: {count}")
 
     def update_status(self, message, color):
         self.status_label.config(text=message, fg=color)
 
-    def restart_backend(self, port):
-        # Cleanup existing connections
-        if self.ws_manager:
-            self.ws_manager.disconnect()
+    def on_listener_status(self, backend, message, color):
+        if len(self.backends) > 1:
+            message = f"{message} (backend :{backend.port})"
+        self.update_status(message, color)
+        if self.backends.connected:
+            self.mark_startup("time-to-connected")
 
-        if self.server_process:
-            self.server_process.terminate()
-
-        # Start new server process
-        self.server_process = self.start_server(port)
-        if not self.server_process:
-            self.update_status("Failed to start server", "red")
+    def mark_startup(self, name):
+        if not self.measure_startup or name in self.startup_marks:
             return
+        self.startup_marks[name] = time.perf_counter() - STARTUP_T0
+        print(f"⏱️ {name}: {self.startup_marks[name] * 1000:.0f} ms")
 
-        # Create new WebSocket connection
-        self.ws_manager = create_listener(
-            port=port,
-            message_callback=self.handle_websocket_message,
-            status_callback=self.update_status
-        )
+    def restart_backend(self, port):
+        # Drops every extra backend too; the listener is created once it reports ready
+        self.backends.restart(port)
+
+    def on_server_ready(self, backend):
+        self.mark_startup("time-to-backend-ready")
+
+    def on_server_failed(self, backend):
+        self.update_status("Failed to start server", "red")
 
     def finish_startup(self):
+        # Show the window right away; the backend boots in the background
+        self.root.deiconify()
+        self.root.update_idletasks()
+        self.mark_startup("time-to-window")
+
         try:
             port = int(self.port_entry.get() or 8080)
         except ValueError:
             port = 8080
         self.restart_backend(port)
-        self.root.deiconify()  # Show the window after full setup
-
 
     def retry_ws(self):
-        if self.ws_manager:
+        if len(self.backends):
             self.retry_button.config(state=tk.DISABLED)
             self.update_status("⏳ Retrying WebSocket connection...", "blue")
-            self.ws_manager.retry_connection()
+            self.backends.retry()
 
     def on_close_window(self):
         try:
-            if self.ws_manager:
-                self.ws_manager.disconnect()
-            
-            if self.server_process:
-                self.server_process.terminate()
-                self.server_process.wait(timeout=5)
+            if self.pipeline:
+                self.pipeline.stop()
+            else:
+                self.ingest_queue.stop()
+            self.dispatcher.stop()
+            if self.journal:
+                # Closing the window ends the session: nothing to restore next time
+                self.journal.close(discard=True)
+            if self.overlay:
+                self.overlay.close()
+            self.backends.stop(wait=True)
         except Exception as e:
             print(f"Error during cleanup: {e}")
         finally:
@@ -248,23 +409,39 @@ class UsernameCompiler:
         entry = self.tiktok_entry if platform == "tiktok" else self.twitch_entry
         status_label = self.tiktok_status_label if platform == "tiktok" else self.twitch_status_label
 
-        username = entry.get().strip()
-        if not username:
+        # Several comma-separated channels are spread over extra backends.
+        # Channel names are case-insensitive: each is connected once, as first typed
+        usernames = {}
+        for name in entry.get().split(","):
+            name = name.strip()
+            if name:
+                usernames.setdefault(name.casefold(), name)
+        usernames = list(usernames.values())
+        if not usernames:
             status_label.config(text="Streamer username is required.", fg="red")
             return
 
-        try:
-            port = self.port_entry.get()
-            res = requests.post(f"http://localhost:{port}/start", json={"username": username, "platform": platform})
-            data = res.json()
+        status_label.config(text=f"⏳ Connecting to {', '.join('@' + name for name in usernames)}...", fg="orange")
+        results = {}
 
-            if res.status_code == 200 and data.get("success") == True:
-                status_label.config(text=f"Connected: @{username}", fg="green")
+        def on_result(username, res, error):
+            if error:
+                results[username] = (False, f"@{username}: Could not connect: {str(error)}")
             else:
-                error_msg = data.get("error", "Connection failed")
-                status_label.config(text=error_msg, fg="red")
-        except Exception as e:
-            status_label.config(text=f"Could not connect: {str(e)}", fg="red")
+                try:
+                    data = res.json()
+                except ValueError:
+                    data = {}
+                if res.status_code == 200 and data.get("success") == True:
+                    results[username] = (True, f"Connected: @{username}")
+                else:
+                    results[username] = (False, f"@{username}: {data.get('error', 'Connection failed')}")
+            if len(results) == len(usernames):
+                ok = all(connected for connected, _ in results.values())
+                status_label.config(text="\n".join(text for _, text in results.values()),
+                                    fg="green" if ok else "red")
+
+        self.backends.connect(platform, usernames, callback=on_result)
 
     def clear_username(self, platform):
         entry = self.tiktok_entry if platform == "tiktok" else self.twitch_entry
@@ -272,281 +449,485 @@ class UsernameCompiler:
         entry.delete(0, tk.END)
         status_label.config(text="", fg="red")
 
-        try:
-            port = self.port_entry.get()
-            requests.post(f"http://localhost:{port}/disconnect", json={"platform": platform})
-        except Exception:
-            pass
+        self.backends.disconnect(platform)
 
     def submit_keyword(self):
         keyword = self.keyword_entry.get().strip()
         if not keyword:
             self.update_keyword_status("Keyword is required.", "red")
             return
-        try:
-            port = self.port_entry.get()
-            res = requests.post(f"http://localhost:{port}/keyword", json={"keyword": keyword})
-            if res.ok:
-                # Clear everything when setting a new keyword
-                self.viewer_text.delete("1.0", tk.END)
-                self.viewer_set.clear()  # Clear the set of tracked viewers
-                self.nickname_map.clear()
-                
-                # Remove all existing color tags
-                for tag in ["tiktok", "twitch"]:
-                    self.viewer_text.tag_remove(tag, "1.0", tk.END)
-                    
+
+        # Clear everything when setting a new keyword. This happens up front
+        # rather than on the reply: by then another backend may already have
+        # sent viewers for the new keyword
+        self.clear_text()
+
+        def on_result(ok, error):
+            if ok:
                 self.update_keyword_status(f"Keyword set: {keyword}", "green")
-            else:
+            elif isinstance(error, RuntimeError):
                 self.update_keyword_status("❌ Failed to set keyword", "red")
-        except Exception:
-            self.update_keyword_status("❌ Could not reach server", "red")
+            else:
+                self.update_keyword_status("❌ Could not reach server", "red")
+
+        self.backends.set_keyword(keyword, callback=on_result)
 
     def clear_keyword(self):
         self.keyword_entry.delete(0, tk.END)
         self.update_keyword_status("", "red")
-        self.viewer_text.delete("1.0", tk.END)
-        self.viewer_set.clear()  # Clear the set of tracked viewers
-        self.nickname_map.clear()
-        
+        self.clear_text()
+
         # Send clearViewers message to server to reset its tracking
-        try:
-            port = self.port_entry.get()
-            requests.post(f"http://localhost:{port}/clearKeyword")
-            
-            # Clear all text tags
-            for tag in ["tiktok", "twitch"]:
-                self.viewer_text.tag_remove(tag, "1.0", tk.END)
-                
-        except Exception as e:
-            print(f"Error clearing keyword: {e}")
-            pass
+        def on_result(ok, error):
+            if error:
+                print(f"Error clearing keyword: {error}")
+
+        self.backends.clear_keyword(callback=on_result)
 
     def update_keyword_status(self, text, color="red"):
         self.keyword_status_label.config(text=text, fg=color)
 
     def show_unsanitized_names(self):
-        self.current_display_mode = "Unsanitized Names"
-        if not hasattr(self.viewer_text, 'original_names') or not self.viewer_text.original_names:
-            return
-            
-        self.viewer_text.delete("1.0", tk.END)
-        for i, (name, platform) in enumerate(self.viewer_text.original_names):
-            if i > 0:
-                self.viewer_text.insert(tk.END, ", ")
-            start = self.viewer_text.index("end-1c")
-            self.viewer_text.insert(tk.END, name)
-            end = self.viewer_text.index("end-1c")
-            self.viewer_text.tag_add(platform, start, end)
+        self.set_display_mode("Unsanitized Names")
 
     def show_sanitized_name(self):
-        self.current_display_mode = "Sanitized Names"
-        if not hasattr(self.viewer_text, 'original_names') or not self.viewer_text.original_names:
-            return
-            
-        self.viewer_text.delete("1.0", tk.END)
-        for i, (name, platform) in enumerate(self.viewer_text.original_names):
-            if i > 0:
-                self.viewer_text.insert(tk.END, ", ")
-            sanitized = self.sanitize_name(name).capitalize()
-            if sanitized:
-                start = self.viewer_text.index("end-1c")
-                self.viewer_text.insert(tk.END, sanitized)
-                end = self.viewer_text.index("end-1c")
-                self.viewer_text.tag_add(platform, start, end)
+        self.set_display_mode("Sanitized Names")
 
     def show_first_word(self):
-        self.current_display_mode = "First Word Only"
-        if not hasattr(self.viewer_text, 'original_names') or not self.viewer_text.original_names:
-            return
-            
-        seen = set()
-        self.viewer_text.delete("1.0", tk.END)
-        for i, (name, platform) in enumerate(self.viewer_text.original_names):
-            cleaned = self.sanitize_name(name)
-            if cleaned:
-                first_word = cleaned.split()[0].capitalize()
-                if first_word not in seen:
-                    seen.add(first_word)
-                    if i > 0 and self.viewer_text.get("1.0", tk.END).strip():
-                        self.viewer_text.insert(tk.END, ", ")
-                    start = self.viewer_text.index("end-1c")
-                    self.viewer_text.insert(tk.END, first_word)
-                    end = self.viewer_text.index("end-1c")
-                    self.viewer_text.tag_add(platform, start, end)
-
-    def format_name_for_display(self, name):
-        if self.current_display_mode == "First Word Only":
-            sanitized_name = self.sanitize_name(name)
-            if sanitized_name:
-                return sanitized_name.split()[0].capitalize()
-        elif self.current_display_mode == "Sanitized Names":
-            sanitized_name = self.sanitize_name(name)
-            if sanitized_name:
-                return sanitized_name.capitalize()
+        self.set_display_mode("First Word Only")
+
+    def set_display_mode(self, mode):
+        # Pure re-render from the cached variants, nothing is re-sanitized
+        self.current_display_mode = mode
+        self.render_list()
+        if self.overlay:
+            self.overlay.set_mode(DISPLAY_MODES[mode], self.viewer_store)
+
+    def apply_search(self):
+        # Runs per keystroke; the search index makes this a re-render, not a scan
+        search = (self.search_entry.get(), self.search_mode.get(), self.search_platform.get())
+        if search != self.applied_search:
+            self.applied_search = search
+            self.render_list()
+
+    def searching(self):
+        return bool(self.search_entry.get()) or SEARCH_PLATFORMS[self.search_platform.get()] is not None
+
+    def render_list(self):
+        self.viewer_text.clear()
+        self.search_capped = False
+        self.viewer_text.append_entries(self.format_rows(0))
+        self.update_count()
+
+    def show_new_viewers(self, start):
+        if start < len(self.viewer_store):
+            render_start = time.perf_counter()
+            self.viewer_text.append_entries(self.format_rows(start))
+            self.viewer_text.see_end()
+            self.update_count()
+            stats.observe(RENDER, time.perf_counter() - render_start)
+
+    def format_rows(self, start):
+        """(text, platform) entries for the current display mode's unique rows
+        from start, limited to the search matches while a search is active."""
+        store = self.viewer_store
+        mode = DISPLAY_MODES[self.current_display_mode]
+        texts = store.texts(mode)
+        if self.searching():
+            rows = self.search_rows(start)
+            rows = [row for row in rows if store.is_unique(mode, row)]
+        else:
+            rows = store.unique_rows_from(mode, start)
+        return [(texts[i], store.platform(i)) for i in rows]
+
+    def search_rows(self, start):
+        """The latest MAX_SEARCH_HITS matching rows from start."""
+        query = self.search_entry.get()
+        platform = SEARCH_PLATFORMS[self.search_platform.get()]
+        if query:
+            rows = self.search.search(query, SEARCH_MODES[self.search_mode.get()], platform=platform, start=start,
+                                      limit=MAX_SEARCH_HITS)
         else:
-            return name
+            # Platform filter alone, newest first
+            platforms = self.viewer_store.platforms
+            code = PLATFORM_CODES[platform]
+            rows = []
+            for row in range(len(self.viewer_store) - 1, start - 1, -1):
+                if platforms[row] == code:
+                    rows.append(row)
+                    if len(rows) == MAX_SEARCH_HITS:
+                        break
+            rows.reverse()
+        if start == 0 and len(rows) == MAX_SEARCH_HITS:
+            self.search_capped = True
+        return rows
 
     def update_viewer_list(self, new_name):
-        formatted_name = self.format_name_for_display(new_name)
-
-        if formatted_name and formatted_name not in self.viewer_set:
-            self.viewer_set.add(formatted_name)
-
-            current_text = self.viewer_text.get("1.0", tk.END).strip()
-
-            if current_text:
-                result = current_text + ", " + formatted_name
-            else:
-                result = formatted_name
-
-            self.viewer_text.delete("1.0", tk.END)
-            self.viewer_text.insert(tk.END, result)
-
-            self.viewer_text.see(tk.END)
-
-        self.viewer_text.update()
+        if self.pipeline:
+            self.pipeline.add(new_name)
+        else:
+            self.compiler.add(new_name)
 
     def clear_text(self):
-        self.viewer_set.clear()
-        self.nickname_map.clear()
-        self.viewer_text.delete("1.0", tk.END)
+        if self.pipeline:
+            self.pipeline.clear()
+        else:
+            self.compiler.clear()
 
     def clear_all(self):
         self.clear_username("tiktok")
         self.clear_username("twitch")
         self.clear_keyword()
 
+    def export_snapshot(self):
+        """Snapshot of the store in the selected export mode, or None if empty."""
+        if not len(self.viewer_store):
+            return None
+        mode = self.export_mode.get()
+        if mode == CURRENT_VIEW:
+            mode = self.current_display_mode
+        return ViewerSnapshot(self.viewer_store, DISPLAY_MODES[mode])
+
+    def run_export(self, work, on_done):
+        # Formatting a big list takes seconds; keep it off the Tk thread
+        def run():
+            try:
+                result = work()
+            except Exception as e:
+                self.dispatcher.call(messagebox.showerror, "Export failed", str(e))
+            else:
+                self.dispatcher.call(on_done, result)
+
+        threading.Thread(target=run, name="export", daemon=True).start()
+
     def save_to_file(self):
-        content = self.viewer_text.get("1.0", tk.END).strip()
-        if not content:
+        snapshot = self.export_snapshot()
+        if snapshot is None:
             return
-        file_path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt")])
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("CSV files", "*.csv"), ("NDJSON files", "*.ndjson")]
+        )
         if file_path:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            self.run_export(lambda: export_to_file(snapshot, file_path),
+                            lambda _: print(f"💾 Saved {len(snapshot)} viewers to {file_path}"))
 
     def copy_list(self):
-        content = self.viewer_text.get("1.0", tk.END).strip()
-        if content:
-            self.copy_to_clipboard(content)
+        snapshot = self.export_snapshot()
+        if snapshot is not None:
+            self.run_export(lambda: export_text(snapshot), self.copy_to_clipboard)
 
     def copy_to_clipboard(self, text):
         self.root.clipboard_clear()
         self.root.clipboard_append(text)
 
     def sanitize_name(self, name):
-        cleaned = ''.join(
-            c if unicodedata.category(c).startswith('L') or c.isspace() else ' '
-            for c in unicodedata.normalize('NFKC', name)
-        )
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        return cleaned
+        return sanitize_name(name)
+
+PLATFORM_TAGS = ("tiktok", "twitch")
+
+class ViewerList(tk.Frame):
+    """Virtualized, comma-separated viewer list.
+
+    Entries live in memory and are packed into fixed-width rows as they
+    arrive; only the rows in view are ever inserted into the Text widget,
+    so redraw cost and Tk memory stay constant however long the list gets.
+    """
+
+    def __init__(self, master, height=10, width=50, **kwargs):
+        super().__init__(master)
+        self.height = height
+        self.width = width
+
+        self.text = tk.Text(self, height=height, width=width, wrap=tk.NONE, state=tk.DISABLED, **kwargs)
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.tag_configure("tiktok", foreground="#00b400")  # Dark green
+        self.text.tag_configure("twitch", foreground="#9146ff")  # Twitch purple
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_mousewheel)
+
+        self.entries = []  # Rendered (text, tag) pairs in display order
+        self.row_starts = []  # Index into entries of the first name on each row
+        self.row_length = 0  # Characters used on the last row
+        self.top_row = 0
+
+    @property
+    def entry_count(self):
+        return len(self.entries)
+
+    @property
+    def row_count(self):
+        return len(self.row_starts)
+
+    def clear(self):
+        self.entries = []
+        self.row_starts = []
+        self.row_length = 0
+        self.top_row = 0
+        self.render()
+
+    def append_entries(self, entries):
+        """Append (text, platform) pairs; only redraws if they land in view."""
+        first_new_row = max(self.row_count - 1, 0)
+        for text, platform in entries:
+            tag = platform if platform in PLATFORM_TAGS else ()
+            length = len(text) + 2  # Name plus ", "
+            if not self.row_starts or (self.row_length and self.row_length + length > self.width):
+                self.row_starts.append(len(self.entries))
+                self.row_length = 0
+            self.row_length += length
+            self.entries.append((text, tag))
+
+        if first_new_row < self.top_row + self.height:
+            self.render()
+        else:
+            self.update_scrollbar()
+
+    def see_end(self):
+        self.scroll_to(self.row_count - self.height)
+
+    def scroll_to(self, row):
+        row = max(0, min(row, self.row_count - self.height))
+        if row != self.top_row:
+            self.top_row = row
+            self.render()
+
+    def yview(self, *args):
+        if args[0] == tk.MOVETO:
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == tk.SCROLL:
+            step = self.height if args[2] == tk.PAGES else 1
+            self.scroll_to(self.top_row + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top_row - 3)
+        else:
+            self.scroll_to(self.top_row + 3)
+        return "break"
+
+    def render(self):
+        rows = self.row_count
+        self.top_row = max(0, min(self.top_row, rows - self.height))
+        last_entry = len(self.entries) - 1
+
+        args = []
+        for row in range(self.top_row, min(rows, self.top_row + self.height)):
+            end = self.row_starts[row + 1] if row + 1 < rows else len(self.entries)
+            for i in range(self.row_starts[row], end):
+                text, tag = self.entries[i]
+                args.extend((text, tag))
+                if i < last_entry:
+                    args.extend((", " if i + 1 < end else ",\n", ()))
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if args:
+            self.text.insert("1.0", *args)
+        self.text.config(state=tk.DISABLED)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        rows = self.row_count
+        if rows <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top_row / rows, (self.top_row + self.height) / rows)
 
-    def start_server(self, port):
-        try:
-            if getattr(sys, 'frozen', False):
-                base_path = sys._MEIPASS
-                server_path = os.path.join(base_path, 'server.exe')
-                proc = subprocess.Popen([server_path, str(port)])
-            else:
-                base_path = os.path.dirname(os.path.abspath(__file__))
-                server_path = os.path.join(base_path, 'server.js')
-                proc = subprocess.Popen(["node", server_path, str(port)])
-
-            print("Waiting for server to start...")
-            
-            def wait_for_port(port, timeout=10):  # Increased timeout
-                start = time.time()
-                retry_interval = 0.5  # Half second between retries
-                
-                while time.time() - start < timeout:
-                    try:
-                        # Try to make an HTTP request to the server
-                        requests.get(f"http://localhost:{port}/health", timeout=1)
-                        print("Server started successfully on port", port)
-                        return True
-                    except requests.RequestException:
-                        time.sleep(retry_interval)
-                        continue
-                return False
-
-            if wait_for_port(port):
-                return proc
-            else:
-                proc.terminate()
-                print("Server failed to start within timeout period")
-                return None
+class StatsPanel(tk.Toplevel):
+    """Live view of the hot-path counters, refreshed once a second."""
 
-        except Exception as e:
-            print("Failed to start server:", e)
-            return None
+    REFRESH_MS = 1000
 
-class ViewerList(scrolledtext.ScrolledText):
-    def __init__(self, master, **kwargs):
-        super().__init__(master, **kwargs)
-        self.tag_configure("tiktok", foreground="#00b400")  # Dark green
-        self.tag_configure("twitch", foreground="#9146ff")  # Twitch purple
-        self.original_names = []  # Store original names and their platforms
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Stream Tool Stats")
+        self.label = tk.Label(self, justify=tk.LEFT, anchor="w", font="TkFixedFont")
+        self.label.pack(padx=10, pady=10)
+        stats.rates()  # Start the rate window now
+        self.refresh()
 
-    def add_viewer(self, name, platform):
-        # Store original name and platform when adding new viewer
-        self.original_names.append((name, platform))
-        
-        # Add to display with appropriate tag
-        if self.get("1.0", tk.END).strip():
-            self.insert(tk.END, ", ")
-        start = self.index("end-1c")
-        self.insert(tk.END, name)
-        end = self.index("end-1c")
-        self.tag_add(platform, start, end)
-
-def handle_websocket_message(self, message):
-    if message == 'clearViewers':
-        self.viewer_text.delete("1.0", tk.END)
-        self.viewer_set.clear()
-        self.nickname_map.clear()
-        self.viewer_text.original_names = []  # Clear original names too
-        return
-
-    try:
-        data = json.loads(message)
-        if data.get("type") == "chat":
-            nickname = data.get("viewerName", "").strip()
-            platform = data.get("platform", "")
-            
-            if nickname and nickname not in self.viewer_set:
-                self.viewer_set.add(nickname)
-                # Store original name and platform
-                self.viewer_text.original_names.append((nickname, platform))
-                
-                # Format display based on current mode
-                display_name = nickname
-                if self.current_display_mode == "Sanitized Names":
-                    display_name = self.sanitize_name(nickname).capitalize()
-                elif self.current_display_mode == "First Word Only":
-                    display_name = self.sanitize_name(nickname).split()[0].capitalize()
-                
-                current_text = self.viewer_text.get("1.0", tk.END).strip()
-                if current_text:
-                    self.viewer_text.insert(tk.END, ", ")
-                
-                start_index = self.viewer_text.index("end-1c")
-                self.viewer_text.insert(tk.END, display_name)
-                end_index = self.viewer_text.index("end-1c")
-                
-                if platform == "tiktok":
-                    self.viewer_text.tag_add("tiktok", start_index, end_index)
-                elif platform == "twitch":
-                    self.viewer_text.tag_add("twitch", start_index, end_index)
-                
-                self.viewer_text.see(tk.END)
-                
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-    except Exception as e:
-        print(f"Unexpected error: {e}")
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        rates = stats.rates()
+        lines = [
+            f"msgs/sec        {rates.get('messages_received', 0):>10.0f}",
+            f"viewers/sec     {rates.get('viewers_accepted', 0):>10.0f}",
+            f"queue depth     {stats.gauges.get('queue_depth', 0):>10}",
+            f"queue drops     {stats.gauges.get('queue_dropped', 0):>10}",
+            f"coalesced       {stats.gauges.get('queue_coalesced', 0):>10}",
+            "",
+            f"{'stage':<14}{'count':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}",
+        ]
+        for stage, histogram in sorted(stats.stages.items()):
+            snap = histogram.snapshot()
+            lines.append(f"{stage:<14}{snap['count']:>9}{snap['p50_ms']:>9.2f}"
+                         f"{snap['p99_ms']:>9.2f}{snap['max_ms']:>9.2f}")
+        self.label.config(text="\n".join(lines))
+        self.after(self.REFRESH_MS, self.refresh)
+
+class TrendsPanel(tk.Toplevel):
+    """Sparklines of viewer count and keyword hits/sec per platform."""
+
+    REFRESH_MS = 1000
+    SPANS = {"10 minutes": 600, "2 hours": 7200, "24 hours": 86400}
+    WIDTH, HEIGHT = 320, 40
+
+    def __init__(self, master, trends):
+        super().__init__(master)
+        self.title("Stream Tool Trends")
+        self.trends = trends
+        self.rows = {}  # series key -> (label, canvas)
+
+        controls = tk.Frame(self)
+        controls.pack(fill=tk.X, padx=10, pady=(10, 0))
+        self.span = tk.StringVar(value="10 minutes")
+        tk.OptionMenu(controls, self.span, *self.SPANS,
+                      command=lambda _: self.refresh(reschedule=False)).pack(side=tk.LEFT)
+        tk.Button(controls, text="Export CSV", command=self.export).pack(side=tk.RIGHT)
+        self.body = tk.Frame(self)
+        self.body.pack(padx=10, pady=10)
+        self.empty_label = tk.Label(self.body, text="Waiting for viewer counts and keyword hits...")
+        self.empty_label.pack()
+        self.refresh()
+
+    def refresh(self, reschedule=True):
+        if not self.winfo_exists():
+            return
+        since = time.time() - self.SPANS[self.span.get()]
+        for key, series in sorted(self.trends.series.items()):
+            if key not in self.rows:
+                self.empty_label.pack_forget()
+                label = tk.Label(self.body, anchor="w", font="TkFixedFont")
+                label.pack(fill=tk.X)
+                canvas = tk.Canvas(self.body, width=self.WIDTH, height=self.HEIGHT, bg="white", highlightthickness=0)
+                canvas.pack(pady=(0, 8))
+                self.rows[key] = (label, canvas)
+            label, canvas = self.rows[key]
+            metric, platform = key
+            unit = "hits/sec" if metric == "hits" else "viewers"
+            latest = series.latest()
+            label.config(text=f"{platform or 'unknown'} {unit}: {latest if latest is None else round(latest, 1)}")
+            self.draw(canvas, series.points(since), since)
+        if reschedule:
+            self.after(self.REFRESH_MS, self.refresh)
+
+    def draw(self, canvas, points, since):
+        canvas.delete("all")
+        if not points:
+            return
+        top = max(value for _, value in points) or 1
+        span = max(time.time() - since, 1)
+        coords = []
+        for start, value in points:
+            coords.append((start - since) / span * self.WIDTH)
+            coords.append(self.HEIGHT - 2 - value / top * (self.HEIGHT - 4))
+        if len(coords) == 2:
+            coords += [coords[0] + 1, coords[1]]
+        canvas.create_line(*coords, fill="#9146ff")
+
+    def export(self):
+        file_path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv",
+                                                 filetypes=[("CSV files", "*.csv")])
+        if file_path:
+            with open(file_path, "w", encoding="utf-8", newline="") as f:
+                self.trends.export_csv(f)
+
+class GiveawayPanel(tk.Toplevel):
+    """Draws winners from the list as currently displayed (dedupe mode)."""
+
+    def __init__(self, master, giveaway, display_mode):
+        super().__init__(master)
+        self.title("Stream Tool Giveaway")
+        self.giveaway = giveaway
+        self.display_mode = display_mode
+
+        controls = tk.Frame(self)
+        controls.pack(padx=10, pady=(10, 0))
+        tk.Label(controls, text="Winners:").grid(row=0, column=0, sticky="w")
+        self.count = tk.Spinbox(controls, from_=1, to=1000, width=6)
+        self.count.grid(row=0, column=1, sticky="w")
+        self.platform = tk.StringVar(value="All platforms")
+        tk.OptionMenu(controls, self.platform, *SEARCH_PLATFORMS).grid(row=0, column=2, padx=5)
+        tk.Label(controls, text="Seed (optional):").grid(row=1, column=0, sticky="w")
+        self.seed = tk.Entry(controls, width=22)
+        self.seed.grid(row=1, column=1, columnspan=2, sticky="w")
+        self.exclude_previous = tk.BooleanVar(value=True)
+        tk.Checkbutton(controls, text="Exclude previous winners",
+                       variable=self.exclude_previous).grid(row=2, column=0, columnspan=3, sticky="w")
+
+        buttons = tk.Frame(self)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Draw", command=self.draw).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Copy Winners", command=self.copy).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Reset Winners", command=self.giveaway.reset).pack(side=tk.LEFT, padx=5)
+
+        self.result = tk.Text(self, height=10, width=40, state=tk.DISABLED)
+        self.result.pack(padx=10, pady=(0, 10))
+        self.winners = []
+
+    def draw(self):
+        try:
+            count = int(self.count.get())
+            seed = int(self.seed.get()) if self.seed.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Giveaway", "Winners and seed must be whole numbers", parent=self)
+            return
+        if count < 1:
+            messagebox.showerror("Giveaway", "Draw at least one winner", parent=self)
+            return
+        draw = self.giveaway.draw(count, self.display_mode(), SEARCH_PLATFORMS[self.platform.get()],
+                                  self.exclude_previous.get(), seed)
+        self.winners = draw.winners
+        if draw.winners:
+            text = "\n".join(draw.winners) + f"\n\nSeed: {draw.seed} ({draw.pool_size} entrants)"
+        else:
+            text = "No eligible viewers."
+        self.result.config(state=tk.NORMAL)
+        self.result.delete("1.0", tk.END)
+        self.result.insert("1.0", text)
+        self.result.config(state=tk.DISABLED)
+
+    def copy(self):
+        if self.winners:
+            self.clipboard_clear()
+            self.clipboard_append(", ".join(self.winners))
 
 if __name__ == "__main__":
-    app = UsernameCompiler()
+    multiprocessing.freeze_support()  # The --pipeline worker in the frozen build
+    parser = argparse.ArgumentParser(description="Stream Tool")
+    parser.add_argument("--measure-startup", action="store_true",
+                        default=bool(os.environ.get("STREAM_TOOL_MEASURE_STARTUP")),
+                        help="print time-to-window and time-to-connected")
+    parser.add_argument("--stats-file", help="append a JSON stats snapshot to this file every 5s")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH,
+                        help=f"viewer journal to restore from after a crash and append to (default {DEFAULT_JOURNAL_PATH})")
+    parser.add_argument("--no-journal", dest="journal", action="store_const", const=None,
+                        help="don't keep a viewer journal")
+    parser.add_argument("--overload-policy", choices=POLICIES, default=DROP_NEWEST,
+                        help="what to shed when chat arrives faster than the list can take it")
+    parser.add_argument("--queue-size", type=int, default=10000,
+                        help="events buffered between the listener and the list")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="listen, dedupe and sanitize in a worker process, keeping the window responsive")
+    parser.add_argument("--overlay-dir",
+                        help="keep text files for an OBS overlay (full list, recent entrants, count) in this folder")
+    parser.add_argument("--overlay-files", default=tuple(OVERLAY_FILES),
+                        type=lambda value: tuple(name.strip() for name in value.split(",") if name.strip()),
+                        help=f"which overlay files to write, comma-separated (default {','.join(OVERLAY_FILES)})")
+    parser.add_argument("--overlay-interval", type=float, default=1.0,
+                        help="minimum seconds between overlay rewrites")
+    parser.add_argument("--overlay-recent", type=int, default=10,
+                        help="entrants in the recent overlay file")
+    parser.add_argument("--draw-log", default=DEFAULT_DRAW_LOG,
+                        help=f"giveaway audit log, one JSON line per draw (default {DEFAULT_DRAW_LOG})")
+    args = parser.parse_args()
+    app = UsernameCompiler(measure_startup=args.measure_startup, stats_file=args.stats_file,
+                           journal_path=args.journal, overload_policy=args.overload_policy,
+                           queue_size=args.queue_size, draw_log=args.draw_log, pipeline=args.pipeline,
+                           overlay_dir=args.overlay_dir, overlay_files=args.overlay_files,
+                           overlay_interval=args.overlay_interval, overlay_recent=args.overlay_recent)
     app.run()
@@ -0,0 +1,149 @@
+"""Headless viewer compiler: streams accepted viewers without a GUI.
+
+    python headless.py --port 8080 --keyword giveaway --format ndjson
+    python headless.py --port 8080 --format csv --output viewers.csv
+    python headless.py --port 8080 --keywords "pick me,giveaway,🔥"
+
+Connects to an already running server.js, dedupes and sanitizes with the
+same ViewerCompiler the GUI uses and writes one record per new viewer.
+With --keywords the backend forwards all chat and every keyword gets its
+own deduped list; records then carry a "keyword" field.
+"""
+import argparse
+import csv
+import json
+import sys
+from compiler import ViewerCompiler, ViewerConsumer
+from control import ControlClient
+from events import is_reset
+from ingest import IngestQueue
+from keywords import MultiKeywordCompiler
+from listener import create_listener
+
+
+class NdjsonWriter(ViewerConsumer):
+    def __init__(self, out, keyword_column=False):
+        self.out = out
+
+    def on_viewers(self, store, start, keyword=None):
+        tag = {"keyword": keyword} if keyword is not None else {}
+        lines = []
+        for record in store.records(start):
+            lines.append(json.dumps({"type": "viewer", **tag, **record._asdict()}, ensure_ascii=False))
+        self.out.write("\n".join(lines) + "\n")
+        self.out.flush()
+
+    def on_clear(self):
+        self.out.write('{"type": "clear"}\n')
+        self.out.flush()
+
+
+class CsvWriter(ViewerConsumer):
+    def __init__(self, out, keyword_column=False):
+        self.out = out
+        self.writer = csv.writer(out)
+        self.writer.writerow((["keyword"] if keyword_column else []) + ["name", "platform", "sanitized", "first_word", "first_seen"])
+
+    def on_viewers(self, store, start, keyword=None):
+        if keyword is None:
+            self.writer.writerows(store.records(start))
+        else:
+            self.writer.writerows((keyword, *record) for record in store.records(start))
+        self.out.flush()
+
+    # CSV has no way to express a reset, so clears are not written
+
+
+WRITERS = {"ndjson": NdjsonWriter, "csv": CsvWriter}
+
+
+def configure_backend(port, args):
+    control = ControlClient(port)
+    try:
+        for platform in ("tiktok", "twitch"):
+            username = getattr(args, platform)
+            if username:
+                res = control.start(username, platform).result()
+                print(f"{platform} @{username}: {res.status_code} {res.text}")
+        if args.keywords:
+            control.set_chat_forwarding(True).result()
+            print(f"💬 Matching keywords locally: {', '.join(args.keywords)}")
+        if args.keyword:
+            control.set_keyword(args.keyword).result()
+            print(f"🔑 Keyword set to: {args.keyword}")
+    finally:
+        control.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080, help="port server.js is listening on")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson")
+    parser.add_argument("--output", help="file to append to (default: stdout)")
+    parser.add_argument("--keyword", help="keyword to set on the backend before listening")
+    parser.add_argument("--keywords", type=lambda value: [k for k in value.split(",") if k.strip()],
+                        help="comma-separated keywords to match locally, one list each")
+    parser.add_argument("--tiktok", help="TikTok streamer to connect the backend to")
+    parser.add_argument("--twitch", help="Twitch channel to connect the backend to")
+    args = parser.parse_args(argv)
+
+    # Records own stdout; the listener's and our own chatter goes to stderr
+    # errors="replace": a name that can't be encoded (a lone surrogate) is
+    # written with "?" for it instead of ending the run
+    if args.output:
+        out = open(args.output, "a", encoding="utf-8", errors="replace", newline="")
+    else:
+        out = sys.stdout
+        out.reconfigure(errors="replace")
+    sys.stdout = sys.stderr
+
+    writer = WRITERS[args.format](out, keyword_column=bool(args.keywords))
+    if args.keywords:
+        multi = MultiKeywordCompiler(args.keywords)
+
+        def handle_batch(events):
+            if any(is_reset(event) for event in events):
+                writer.on_clear()
+            first_rows = {}
+            for keyword, row in multi.handle_batch(events):
+                first_rows.setdefault(keyword, row)
+            for keyword, row in first_rows.items():
+                writer.on_viewers(multi.stores[keyword], row, keyword)
+    else:
+        compiler = ViewerCompiler()
+        compiler.add_consumer(writer)
+        handle_batch = compiler.handle_batch
+    ingest_queue = IngestQueue(root=None, batch_callback=handle_batch)
+
+    try:
+        configure_backend(args.port, args)
+    except Exception as e:
+        print(f"❌ Could not configure backend: {e}")
+        return 1
+
+    ws_manager = create_listener(
+        port=args.port,
+        message_callback=ingest_queue.put,
+        status_callback=lambda message, color: print(message)
+    )
+    try:
+        while True:
+            if ingest_queue.wait(timeout=0.5):
+                handle_batch(ingest_queue.take())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ws_manager.disconnect()
+        if args.keywords:
+            control = ControlClient(args.port)
+            try:
+                control.set_chat_forwarding(False).result()
+            except Exception:
+                pass
+            control.close()
+        if out is not sys.__stdout__:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
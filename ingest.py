@@ -0,0 +1,194 @@
+import threading
+import logging
+import time
+from collections import deque
+from events import is_reset
+
+logger = logging.getLogger(__name__)
+
+# What put() does once the queue is full
+DROP_NEWEST = "drop-newest"  # Refuse the incoming event
+DROP_OLDEST = "drop-oldest"  # Evict the oldest pending non-control event to make room
+SAMPLE = "sample"  # Past half full, keep only every sample_every-th event
+POLICIES = (DROP_NEWEST, DROP_OLDEST, SAMPLE)
+
+# How long the shedding flag stays up after the last shed event
+SHED_HOLD_SECONDS = 2.0
+
+
+class IngestQueue:
+    """Bounded hand-off between the listener thread and the Tk loop.
+
+    The websocket thread calls put(); the Tk loop drains the queue every
+    interval_ms via root.after and hands each batch to batch_callback, so a
+    single widget update covers many messages and Tk is only ever touched
+    from its own thread. Without a Tk loop, consumers can instead block in
+    wait() and call take() themselves.
+
+    Under a flood the queue sheds load instead of falling behind live chat.
+    A keyword hit from a viewer who already has one pending is coalesced
+    away (lossless, the store would dedupe it anyway), and once the queue
+    is full policy decides what goes. Control events are never shed. The
+    shed counts are kept per reason and shedding stays true for a couple of
+    seconds after the last one.
+    """
+
+    def __init__(self, root, batch_callback, maxsize=10000, batch_size=500, interval_ms=16,
+                 policy=DROP_NEWEST, coalesce=True, sample_every=4):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.root = root
+        self.batch_callback = batch_callback
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.interval_ms = interval_ms
+        self.policy = policy
+        self.coalesce = coalesce
+        self.sample_every = sample_every
+        self.shed = {"coalesced": 0, "dropped_newest": 0, "dropped_oldest": 0, "sampled_out": 0}
+        self.last_shed = None
+        self._items = deque()
+        self._pending_names = set()  # Viewers with a chat event in the queue
+        self._sample_count = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Event()
+        self._after_id = None
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def dropped(self):
+        """Events shed for lack of room (coalesced ones aren't lost)."""
+        return self.shed["dropped_newest"] + self.shed["dropped_oldest"] + self.shed["sampled_out"]
+
+    @property
+    def shedding(self):
+        return self.last_shed is not None and time.monotonic() - self.last_shed < SHED_HOLD_SECONDS
+
+    def _count_shed(self, reason):
+        # Called with the lock held
+        self.shed[reason] += 1
+        self.last_shed = time.monotonic()
+        if reason != "coalesced":
+            dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"⚠️ Ingest queue overloaded ({self.policy}), dropped {dropped} events")
+
+    def put(self, event):
+        """Called from the listener thread; never blocks."""
+        with self._lock:
+            if is_reset(event):
+                # Anything still pending belongs to the list being cleared
+                self._items.clear()
+                self._pending_names.clear()
+            elif event.type != "control":
+                name = event.viewer_name if event.type == "chat" else None
+                if self.coalesce and name and name in self._pending_names:
+                    self._count_shed("coalesced")
+                    return
+                if self.policy == SAMPLE and len(self._items) >= self.maxsize // 2:
+                    self._sample_count += 1
+                    if self._sample_count % self.sample_every:
+                        self._count_shed("sampled_out")
+                        return
+                if len(self._items) >= self.maxsize:
+                    if self.policy != DROP_OLDEST:
+                        self._count_shed("dropped_newest")
+                        return
+                    if not self._evict_oldest():
+                        self._count_shed("dropped_newest")
+                        return
+                    self._count_shed("dropped_oldest")
+                if self.coalesce and name:
+                    self._pending_names.add(name)
+            self._items.append(event)
+            self._not_empty.set()
+
+    def _evict_oldest(self):
+        # Called with the lock held. Control events are never shed: step
+        # over any at the head (a reset that just emptied the queue, say)
+        # and evict the oldest event behind them
+        items = self._items
+        held = []
+        while items and items[0].type == "control":
+            held.append(items.popleft())
+        evicted = bool(items)
+        if evicted:
+            self._forget(items.popleft())
+        items.extendleft(reversed(held))
+        return evicted
+
+    def _forget(self, event):
+        # Called with the lock held, for every event leaving the queue
+        if event.type == "chat":
+            self._pending_names.discard(event.viewer_name)
+
+    def take(self, limit=None):
+        """Pop up to limit queued messages (default: batch_size)."""
+        limit = limit or self.batch_size
+        with self._lock:
+            count = min(limit, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            if self._pending_names:
+                for event in batch:
+                    self._forget(event)
+            if not self._items:
+                self._not_empty.clear()
+            return batch
+
+    def wait(self, timeout=None):
+        """Block until something is queued; returns False on timeout."""
+        return self._not_empty.wait(timeout)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _drain(self):
+        try:
+            batch = self.take()
+            if batch:
+                self.batch_callback(batch)
+        except Exception as e:
+            logger.error(f"❌ Ingest batch failed: {e}")
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+
+class TkDispatcher:
+    """Runs callables on the Tk thread; call() is safe from any thread."""
+
+    def __init__(self, root, interval_ms=50):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._calls = deque()
+        self._after_id = None
+
+    def call(self, func, *args):
+        self._calls.append((func, args))  # deque.append is atomic
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._poll)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _poll(self):
+        try:
+            while self._calls:
+                func, args = self._calls.popleft()
+                try:
+                    func(*args)
+                except Exception as e:
+                    logger.error(f"❌ UI callback failed: {e}")
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._poll)
@@ -0,0 +1,206 @@
+import os
+import struct
+import time
+import threading
+import logging
+from array import array
+from collections import deque
+from compiler import ViewerConsumer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".stream_tool", "viewers.journal")
+
+# Each flush appends one block: this header, then the block's platform
+# codes (one byte each), first-seen times (native doubles) and the UTF-8
+# names, sanitized names and first words, each column's values joined by
+# newlines. The header holds the row count and the byte length of each text
+_MAGIC = b"VJ2\n"
+_HEADER = struct.Struct("<4sIIII")
+_ESCAPES = (("\\", "\\\\"), ("\n", "\\n"))
+
+
+def _escape(text):
+    for raw, escaped in _ESCAPES:
+        text = text.replace(raw, escaped)
+    return text
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+    out = []
+    chars = iter(text)
+    for c in chars:
+        if c == "\\":
+            c = "\n" if next(chars, "") == "n" else "\\"
+        out.append(c)
+    return "".join(out)
+
+
+def _join(values):
+    text = "\n".join(values)
+    if "\\" in text or text.count("\n") != len(values) - 1:
+        # Escapes are rare: only a column that needs one pays for it
+        text = "\n".join(map(_escape, values))
+    # A lone surrogate can't be encoded; it's written as "?" instead
+    return text.encode("utf-8", "replace")
+
+
+def _split(blocks):
+    text = b"\n".join(blocks).decode("utf-8")
+    values = text.split("\n")
+    # Visit only the values that contain an escape
+    row, counted = 0, 0
+    pos = text.find("\\")
+    while pos != -1:
+        row += text.count("\n", counted, pos)
+        values[row] = _unescape(values[row])
+        counted = text.find("\n", pos)
+        if counted == -1:
+            break
+        pos = text.find("\\", counted)
+    return values
+
+
+class ViewerJournal(ViewerConsumer):
+    """Append-only on-disk copy of the accepted viewers.
+
+    Stored column by column, one block per flush (see _HEADER), with the
+    derived forms alongside the raw names, so replay() can refill a
+    ViewerStore with a few bulk reads and splits and without sanitizing
+    anything. Writes are batched on a background thread every
+    flush_interval seconds and fsynced at most every fsync_interval
+    seconds; a clear truncates the file, which is all the compaction an
+    append-only list of unique names needs. An orderly close(discard=True)
+    truncates it too, so only a crash leaves viewers to restore.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, flush_interval=0.25, fsync_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.file = None
+        self.thread = None
+        self._ops = deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self._last_fsync = 0.0
+
+    def replay(self, store):
+        """Load the journal into store; returns how many viewers were restored.
+
+        A last block torn by a crash mid-write is cut off the file, so that
+        blocks appended after it stay readable.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+
+        platforms = bytearray()
+        first_seen = array('d')
+        texts = ([], [], [])
+        pos = 0
+        while len(data) - pos >= _HEADER.size:
+            magic, rows, *lengths = _HEADER.unpack_from(data, pos)
+            if magic != _MAGIC:
+                logger.warning(f"⚠️ Journal {self.path} is malformed at byte {pos}, skipping the rest")
+                break
+            end = pos + _HEADER.size + 9 * rows + sum(lengths)
+            if end > len(data):
+                break
+            pos += _HEADER.size
+            platforms += data[pos:pos + rows]
+            pos += rows
+            first_seen.frombytes(data[pos:pos + 8 * rows])
+            pos += 8 * rows
+            for blocks, length in zip(texts, lengths):
+                blocks.append(data[pos:pos + length])
+                pos += length
+        if pos < len(data):
+            os.truncate(self.path, pos)
+        if not platforms:
+            return 0
+
+        try:
+            names, sanitized, first_words = map(_split, texts)
+        except UnicodeDecodeError as e:
+            logger.warning(f"⚠️ Journal {self.path} is malformed ({e}), not restoring it")
+            return 0
+        if not len(names) == len(sanitized) == len(first_words) == len(platforms):
+            logger.warning(f"⚠️ Journal {self.path} is malformed, not restoring it")
+            return 0
+        store.load(names, platforms, sanitized, first_words, first_seen)
+        return len(names)
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.file = open(self.path, "ab")
+        self.thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self, discard=False):
+        """Write out what's pending and close. discard truncates the
+        journal instead, for an orderly shutdown."""
+        if discard:
+            self._ops.clear()
+            self._ops.append(None)
+        if self.thread:
+            self._closed = True
+            self._wake.set()
+            self.thread.join(timeout=5)
+            self.thread = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def on_viewers(self, store, start):
+        # Column slices are cheap; encoding happens on the writer thread
+        self._ops.append((store.platforms[start:], store.first_seen[start:], store.names[start:],
+                          store.sanitized[start:], store.first_words[start:]))
+
+    def on_clear(self):
+        self._ops.append(None)
+        self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._flush()
+            except (OSError, ValueError) as e:
+                # The thread has to keep running, or _ops would grow for the rest of the session
+                logger.error(f"❌ Journal write failed: {e}")
+        self._flush(force_sync=True)
+
+    def _flush(self, force_sync=False):
+        wrote = truncated = False
+        while self._ops:
+            op = self._ops.popleft()
+            if op is None:
+                self.file.seek(0)
+                self.file.truncate()
+                truncated = True
+                continue
+            platforms, first_seen, *columns = op
+            if not platforms:
+                continue
+            texts = [_join(column) for column in columns]
+            self.file.write(_HEADER.pack(_MAGIC, len(platforms), *map(len, texts)))
+            self.file.write(platforms.tobytes())
+            self.file.write(first_seen.tobytes())
+            for text in texts:
+                self.file.write(text)
+            wrote = True
+
+        if not (wrote or truncated or force_sync):
+            return
+        self.file.flush()
+        now = time.monotonic()
+        if truncated or force_sync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self._last_fsync = now
@@ -0,0 +1,139 @@
+import re
+from events import is_reset
+from viewer_store import ViewerStore
+
+# Same ranges server.js's createKeywordMatcher uses
+EMOJI = "\U0001F300-\U0001F9FF"
+SUFFIX = f"[!.?]*(?:[{EMOJI}]+)?"
+EMOJI_ONLY_RE = re.compile(f"^[{EMOJI}]+$")
+SUFFIX_RE = re.compile(SUFFIX + "$")
+RUNS_RE = re.compile(r"(.)\1+", re.DOTALL)
+SEPARATORS_RE = re.compile(r"[\s']+")
+SUFFIX_CHARS_RE = re.compile(f"[!.?{EMOJI}]")
+
+
+def normalize_keyword(keyword):
+    return re.sub(r"\s+", " ", keyword.lower().replace("’", "'")).strip()
+
+
+def compile_keyword(keyword):
+    """Python port of server.js createKeywordMatcher: the regex a whole
+    chat message must match for keyword."""
+    if EMOJI_ONLY_RE.match(keyword):
+        # Emoji keyword: the emoji, repeated
+        return re.compile(f"^{re.escape(keyword)}+$")
+
+    words = normalize_keyword(keyword).split(" ")
+    if len(words) > 1:
+        # Multi-word phrases, spaces and apostrophes allowed between words
+        pattern = r"[\s']*".join(re.escape(word.replace("'", "")) for word in words)
+    else:
+        # Single word, each letter may be repeated
+        pattern = "".join(f"{re.escape(c)}+" for c in words[0].replace("'", ""))
+    return re.compile(f"^{pattern}{SUFFIX}$", re.IGNORECASE)
+
+
+class KeywordEngine:
+    """Matches a chat message against any number of keywords in one pass.
+
+    Every keyword's regex is compiled once. Rather than trying each regex in
+    turn, a message is reduced to two cheap routing keys (its letters with
+    repeats collapsed, and its letters with spaces/apostrophes removed) and
+    only the keywords filed under those keys are verified with their regex,
+    so the cost per message barely grows with the number of keywords.
+    Keywords whose shape doesn't fit the keys (emoji keywords, or ones
+    ending in a suffix character) are always verified.
+    """
+
+    def __init__(self, keywords=()):
+        self.patterns = {}
+        self.by_runs = {}  # Collapsed single word -> keywords
+        self.by_words = {}  # Joined multi-word phrase -> keywords
+        self.always = []
+        for keyword in keywords:
+            self.add(keyword)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __contains__(self, keyword):
+        return keyword in self.patterns
+
+    def add(self, keyword):
+        keyword = keyword.strip()
+        if not keyword or keyword in self.patterns:
+            return
+        self.patterns[keyword] = compile_keyword(keyword)
+
+        words = [word.replace("'", "") for word in normalize_keyword(keyword).split(" ")]
+        if EMOJI_ONLY_RE.match(keyword) or SUFFIX_CHARS_RE.match(words[-1][-1:] or "!"):
+            self.always.append(keyword)
+        elif len(words) > 1:
+            self.by_words.setdefault("".join(words), []).append(keyword)
+        else:
+            self.by_runs.setdefault(RUNS_RE.sub(r"\1", words[0]), []).append(keyword)
+
+    def remove(self, keyword):
+        keyword = keyword.strip()
+        if self.patterns.pop(keyword, None) is None:
+            return
+        for index in (self.by_runs, self.by_words):
+            for key, keywords in list(index.items()):
+                if keyword in keywords:
+                    keywords.remove(keyword)
+                    if not keywords:
+                        del index[key]
+        if keyword in self.always:
+            self.always.remove(keyword)
+
+    def match(self, text):
+        """Every keyword the message matches, in no particular order."""
+        core = text[:SUFFIX_RE.search(text).start()].lower()
+        patterns = self.patterns
+        matched = [k for k in self.by_runs.get(RUNS_RE.sub(r"\1", core), ()) if patterns[k].match(text)]
+        matched.extend(k for k in self.by_words.get(SEPARATORS_RE.sub("", core), ()) if patterns[k].match(text))
+        matched.extend(k for k in self.always if patterns[k].match(text))
+        return matched
+
+
+class MultiKeywordCompiler:
+    """Runs several giveaways at once: one deduped ViewerStore per keyword.
+
+    Feed it chat messages (ChatMessageEvent batches from a backend with chat
+    forwarding on); each message goes to every keyword it matches.
+    """
+
+    def __init__(self, keywords=()):
+        self.engine = KeywordEngine()
+        self.stores = {}
+        self.set_keywords(keywords)
+
+    def set_keywords(self, keywords):
+        self.engine = KeywordEngine(keywords)
+        self.stores = {keyword: self.stores[keyword] if keyword in self.stores else ViewerStore()
+                       for keyword in self.engine.patterns}
+
+    def handle_message(self, viewer_name, message, platform=""):
+        """Returns the keywords viewer_name was newly accepted under."""
+        accepted = []
+        if viewer_name:
+            for keyword in self.engine.match(message):
+                if self.stores[keyword].add(viewer_name, platform) is not None:
+                    accepted.append(keyword)
+        return accepted
+
+    def handle_batch(self, events):
+        """Returns (keyword, store row) for every new acceptance in the batch."""
+        accepted = []
+        for event in events:
+            if event.type == "chatMessage":
+                for keyword in self.handle_message(event.viewer_name, event.message, event.platform):
+                    accepted.append((keyword, len(self.stores[keyword]) - 1))
+            elif is_reset(event):
+                self.clear()
+                accepted = []
+        return accepted
+
+    def clear(self):
+        for store in self.stores.values():
+            store.clear()
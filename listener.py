@@ -2,37 +2,75 @@ import websocket
 import threading
 import logging
 import time
-import json  # Add this at the top with other imports
+import random
+import asyncio
+from events import decode_frame
+from stats import stats as shared_stats, WS_RECEIVE, WS_DECODE
+
+try:
+    import websockets
+except ImportError:  # Optional: only needed for AsyncWebSocketManager
+    websockets = None
 
 # Configure logging to only show WARNING and above
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 class WebSocketManager:
-    def __init__(self, port, message_callback=None, status_callback=None):
+    def __init__(self, port, message_callback=None, status_callback=None, stats=None):
         self.port = port
         self.ws = None
         self.connected = False
-        self.message_callback = message_callback
+        self.message_callback = message_callback  # Receives every decoded event
         self.status_callback = status_callback
+        self.handlers = {}  # Event type -> callbacks, see add_handler()
         self.ws_thread = None
+        self.stats = stats or shared_stats
+
+        # Connection metrics, see metrics()
+        self.messages_received = 0
+        self.reconnect_count = 0
+        self.last_reconnect_seconds = None
+
+    def metrics(self):
+        return {
+            "connected": self.connected,
+            "messages_received": self.messages_received,
+            "reconnect_count": self.reconnect_count,
+            "last_reconnect_seconds": self.last_reconnect_seconds,
+        }
 
     def on_message(self, ws, message):  # Fixed indentation - this is a class method
-        # Handle plain text control messages first
-        if message in ['clearViewers', 'disconnect']:
-            if self.message_callback:
-                self.message_callback(message)
+        self.messages_received += 1
+        self.stats.incr("messages_received")
+        start = time.perf_counter()
+        try:
+            self.dispatch_message(message)
+        finally:
+            self.stats.observe(WS_RECEIVE, time.perf_counter() - start)
+
+    def add_handler(self, event_type, callback):
+        """Call callback(event) for every event of event_type ("chat", "control", "viewerCount")."""
+        self.handlers.setdefault(event_type, []).append(callback)
+
+    def dispatch_message(self, message):
+        # Decoded exactly once here; everything downstream gets event objects
+        try:
+            decode_start = time.perf_counter()
+            events = decode_frame(message)
+            self.stats.observe(WS_DECODE, time.perf_counter() - decode_start)
+        except (ValueError, TypeError, AttributeError):
+            # A bad frame is dropped, never allowed to take the connection down
+            self.stats.incr("decode_errors")
+            logger.error(f"❌ Failed to decode message: {message}")
             return
 
         try:
-            data = json.loads(message)
-            if data.get("type") == "chat":
+            for event in events:
+                for handler in self.handlers.get(event.type, ()):
+                    handler(event)
                 if self.message_callback:
-                    self.message_callback(message)
-        except json.JSONDecodeError:
-            # Only log if it's not a known control message
-            if message not in ['clearViewers', 'disconnect']:
-                logger.error(f"❌ Failed to decode message: {message}")
+                    self.message_callback(event)
         except Exception as e:
             logger.error(f"❌ WebSocket error: {e}")
 
@@ -92,13 +130,132 @@ class WebSocketManager:
         self.connected = False
 
     def retry_connection(self):
+        self.reconnect_count += 1
         self.disconnect()
         time.sleep(1)  # Short delay before reconnecting
         self.connect()
 
-def create_listener(port, message_callback=None, status_callback=None):
-    """Factory function to create and start a WebSocket listener"""
-    ws_manager = WebSocketManager(port, message_callback, status_callback)
+
+class AsyncWebSocketManager(WebSocketManager):
+    """WebSocketManager running on its own asyncio loop thread.
+
+    Reconnects by itself after any drop, waiting a jittered exponential
+    backoff between attempts (starting around backoff_base seconds, capped at
+    backoff_max), so a restarted backend is picked up without user action.
+    """
+
+    def __init__(self, port, message_callback=None, status_callback=None, stats=None,
+                 backoff_base=0.1, backoff_max=10.0):
+        if websockets is None:
+            raise RuntimeError("AsyncWebSocketManager requires the 'websockets' package")
+        super().__init__(port, message_callback, status_callback, stats)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.loop = None
+        self.task = None
+        self._wake = None
+
+    def backoff_delay(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self):
+        attempt = 0
+        disconnected_at = None
+        self._wake = asyncio.Event()
+        while True:
+            if self.status_callback:
+                self.status_callback("⏳ Attempting to connect...", "orange")
+            try:
+                async with websockets.connect(f"ws://localhost:{self.port}",
+                                              ping_interval=30, ping_timeout=10) as ws:
+                    self.ws = ws
+                    attempt = 0
+                    if disconnected_at is not None:
+                        self.reconnect_count += 1
+                        self.last_reconnect_seconds = time.monotonic() - disconnected_at
+                        disconnected_at = None
+                    self.on_open(ws)
+                    async for message in ws:
+                        self.on_message(ws, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.on_error(self.ws, e)
+
+            if self.connected:
+                self.on_close(self.ws, None, None)
+            self.ws = None
+            if disconnected_at is None:
+                disconnected_at = time.monotonic()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.backoff_delay(attempt))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            attempt += 1
+
+    def connect(self):
+        if self.ws_thread and self.ws_thread.is_alive():
+            print("WebSocket listener already running")
+            return
+
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(self.run())
+
+        def run_loop():
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self.task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self.loop.close()
+
+        self.ws_thread = threading.Thread(target=run_loop, daemon=True)
+        self.ws_thread.start()
+
+    def disconnect(self):
+        if self.loop and self.task and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.task.cancel)
+            except RuntimeError:
+                pass  # Loop closed in between
+        if self.ws_thread and self.ws_thread is not threading.current_thread():
+            self.ws_thread.join(timeout=1)
+        self.ws = None
+        self.connected = False
+
+    def retry_connection(self):
+        # Skip whatever backoff is pending and try again right away. The
+        # running loop is asked to reconnect rather than torn down: under
+        # load it can take over a second to get to a cancellation, and
+        # connect() would then find the old thread still running
+        if self.ws_thread and self.ws_thread.is_alive():
+            try:
+                self.loop.call_soon_threadsafe(self._reconnect_now)
+                return
+            except RuntimeError:
+                pass  # Loop closed in between
+        self.connect()
+
+    def _reconnect_now(self):
+        # Loop thread
+        self._wake.set()
+        if self.ws is not None:
+            asyncio.ensure_future(self.ws.close())
+
+
+def create_listener(port, message_callback=None, status_callback=None, use_asyncio=None, stats=None):
+    """Factory function to create and start a WebSocket listener
+
+    use_asyncio=None picks the auto-reconnecting AsyncWebSocketManager when
+    the 'websockets' package is installed, else the threaded WebSocketManager.
+    """
+    if use_asyncio is None:
+        use_asyncio = websockets is not None
+    manager_class = AsyncWebSocketManager if use_asyncio else WebSocketManager
+    ws_manager = manager_class(port, message_callback, status_callback, stats)
     ws_manager.connect()
     return ws_manager
 
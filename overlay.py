@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+import logging
+from compiler import ViewerConsumer
+from export import CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Overlay files and the name each is written under
+OVERLAY_FILES = {"list": "viewers.txt", "recent": "recent.txt", "count": "count.txt"}
+
+
+def replace_file(path, text_chunks):
+    """Write path via a temporary file and a rename, so a reader such as
+    OBS sees either the old file or the new one, never half of one."""
+    temp_path = path + ".tmp"
+    # errors="replace": a name that can't be encoded (a lone surrogate) is
+    # written as "?" rather than stopping the overlay
+    with open(temp_path, "w", encoding="utf-8", errors="replace", newline="") as f:
+        for chunk in text_chunks:
+            f.write(chunk)
+    os.replace(temp_path, path)
+
+
+class OverlayWriter(ViewerConsumer):
+    """Keeps text files for an OBS text source in step with the list.
+
+    Writes the full list ("list"), the last recent_count entrants, newest
+    last ("recent"), and the count ("count") into directory, for the unique
+    viewers of mode. on_viewers() only records what the list looks like
+    now, in O(1); a background thread rewrites the files at most once per
+    min_interval seconds from the latest state, so disk I/O is bounded
+    however fast viewers arrive, and the final state is always written.
+    Files whose content hasn't changed are left alone.
+    """
+
+    def __init__(self, directory, files=tuple(OVERLAY_FILES), min_interval=1.0, recent_count=10,
+                 mode="raw", separator=", "):
+        unknown = set(files) - set(OVERLAY_FILES)
+        if unknown:
+            raise ValueError(f"Unknown overlay files: {', '.join(sorted(unknown))}")
+        self.directory = directory
+        self.files = files
+        self.min_interval = min_interval
+        self.recent_count = recent_count
+        self.mode = mode
+        self.separator = separator
+        self.thread = None
+        self._pending = ([], None, 0)
+        self._written = {}  # file kind -> what it was last written from
+        self._wake = threading.Event()
+        self._closed = False
+        self._last_write = 0.0
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._wake.set()  # Write the initial state
+        self.thread = threading.Thread(target=self._run, name="overlay", daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        if self.thread:
+            self._closed = True
+            self._wake.set()
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def on_viewers(self, store, start):
+        # The columns are append-only and clear() swaps in new ones, so the
+        # first count rows of these stay valid for the writer thread
+        mode = self.mode
+        self._pending = (store.texts(mode), None if mode == "raw" else store.mode_rows(mode),
+                         store.unique_count(mode))
+        self._wake.set()
+
+    def on_clear(self):
+        self._pending = ([], None, 0)
+        self._wake.set()
+
+    def set_mode(self, mode, store):
+        self.mode = mode
+        self.on_viewers(store, 0)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            # Rate limit: changes arriving meanwhile are folded into one write
+            delay = self._last_write + self.min_interval - time.monotonic()
+            if delay > 0 and not self._closed:
+                time.sleep(delay)
+            self._last_write = time.monotonic()
+            try:
+                self._write(self._pending)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Overlay write failed: {e}")
+                self._written = {}  # Retry everything after min_interval
+                self._wake.set()
+
+    def _write(self, state):
+        texts, unique_rows, count = state
+        if unique_rows is None:
+            rows = range(count)
+        else:
+            rows = unique_rows[:count]
+        for kind in self.files:
+            written = self._written.get(kind)
+            if kind == "list":
+                # Same columns and count means the same rows
+                key = (texts, unique_rows, count)
+                if written and written[0] is texts and written[1] is unique_rows and written[2] == count:
+                    continue
+            else:
+                key = count if kind == "count" else [texts[i] for i in rows[max(0, len(rows) - self.recent_count):]]
+                if written == key:
+                    continue
+            path = os.path.join(self.directory, OVERLAY_FILES[kind])
+            if kind == "list":
+                replace_file(path, self._list_chunks(texts, rows))
+            elif kind == "recent":
+                replace_file(path, ["\n".join(key)])
+            else:
+                replace_file(path, [str(count)])
+            self._written[kind] = key
+
+    def _list_chunks(self, texts, rows):
+        separator = ""
+        for start in range(0, len(rows), CHUNK_SIZE):
+            yield separator + self.separator.join(texts[i] for i in rows[start:start + CHUNK_SIZE])
+            separator = self.separator
@@ -0,0 +1,301 @@
+import multiprocessing
+import threading
+import time
+from array import array
+from collections import deque
+from backend import ResetFilter
+from compiler import ViewerCompiler, ViewerConsumer
+from events import is_reset
+from ingest import IngestQueue, DROP_NEWEST
+from listener import create_listener
+from stats import stats
+from timeseries import StreamTrends
+
+POLL_MS = 16
+# Longest the Tk loop spends applying worker messages per poll
+POLL_BUDGET_SECONDS = 0.008
+LOAD_REPORT_SECONDS = 0.25
+
+
+# --- Worker process -------------------------------------------------------
+
+class _RowShipper(ViewerConsumer):
+    """Sends each batch of new rows, already sanitized, to the GUI."""
+
+    def __init__(self, send):
+        self.send = send
+
+    def on_viewers(self, store, start):
+        self.send(("rows", start, store.names[start:], store.platforms[start:].tobytes(),
+                   store.sanitized[start:], store.first_words[start:], store.first_seen[start:].tobytes()))
+
+    def on_clear(self):
+        self.send(("clear",))
+
+
+class _Worker:
+    """Owns the listeners, the ingest queue and the deduping model.
+
+    Commands from the GUI are read on their own thread. Reset expectations
+    apply at once, since the resets they describe come in on listener
+    threads; everything touching the model is queued for the main loop.
+    """
+
+    def __init__(self, conn, maxsize, policy):
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.compiler = ViewerCompiler()
+        self.compiler.add_consumer(_RowShipper(self.send))
+        self.queue = IngestQueue(None, None, maxsize=maxsize, policy=policy)
+        self.resets = ResetFilter()
+        self.listeners = {}  # port -> listener
+        self.commands = deque()
+        self.running = True
+
+    def send(self, message):
+        with self.send_lock:
+            self.conn.send(message)
+
+    def read_commands(self):
+        while self.running:
+            try:
+                command = self.conn.recv()
+            except (EOFError, OSError):
+                command = ("stop",)  # GUI went away
+            if command[0] == "expect_reset":
+                self.resets.expect(command[1])
+            elif command[0] == "expect_late_reset":
+                self.resets.expect_late(command[1])
+            else:
+                self.commands.append(command)
+                if command[0] == "stop":
+                    return
+
+    def on_event(self, port, event):
+        # Listener thread
+        if is_reset(event) and not self.resets.forward(port):
+            return
+        self.queue.put(event)
+
+    def on_status(self, port, message, color):
+        listener = self.listeners.get(port)
+        self.send(("status", port, message, color, bool(listener and listener.connected)))
+
+    def run_command(self, name, *args):
+        if name == "connect":
+            port = args[0]
+            old = self.listeners.pop(port, None)
+            if old:
+                old.disconnect()
+            listener = create_listener(port, lambda event: self.on_event(port, event),
+                                       lambda message, color: self.on_status(port, message, color))
+            self.listeners[port] = listener
+            if listener.connected:  # Connected before it was registered
+                self.on_status(port, "✅ WebSocket Connected", "green")
+        elif name == "disconnect":
+            listener = self.listeners.pop(args[0], None)
+            if listener:
+                listener.disconnect()
+        elif name == "retry":
+            listener = self.listeners.get(args[0])
+            if listener:
+                listener.retry_connection()
+        elif name == "load":
+            self.compiler.store.load(*args)
+        elif name == "add":
+            self.compiler.add(*args)
+        elif name == "clear":
+            self.compiler.clear()
+        elif name == "stop":
+            self.running = False
+
+    def run(self):
+        next_report = 0.0
+        while self.running:
+            while self.commands:
+                self.run_command(*self.commands.popleft())
+            batch = self.queue.take()
+            if batch:
+                hits, counts = StreamTrends.summarize(batch)
+                if hits or counts:
+                    self.send(("trends", hits, counts, time.time()))
+                self.compiler.handle_batch(batch)
+            else:
+                self.queue.wait(POLL_MS / 1000)
+            now = time.monotonic()
+            if now >= next_report:
+                next_report = now + LOAD_REPORT_SECONDS
+                received = {port: listener.messages_received for port, listener in self.listeners.items()}
+                self.send(("load", len(self.queue), dict(self.queue.shed), self.queue.shedding, received))
+        for listener in self.listeners.values():
+            listener.disconnect()
+
+
+def _worker_main(conn, maxsize, policy):
+    worker = _Worker(conn, maxsize, policy)
+    threading.Thread(target=worker.read_commands, name="pipeline-commands", daemon=True).start()
+    try:
+        worker.run()
+    except (EOFError, OSError, BrokenPipeError):
+        pass  # GUI went away
+
+
+# --- GUI process ----------------------------------------------------------
+
+class QueueStatus:
+    """The worker's ingest queue as last reported, for the load indicator."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.depth = 0
+        self.shed = {"coalesced": 0, "dropped_newest": 0, "dropped_oldest": 0, "sampled_out": 0}
+        self.shedding = False
+
+    def __len__(self):
+        return self.depth
+
+    @property
+    def dropped(self):
+        return self.shed["dropped_newest"] + self.shed["dropped_oldest"] + self.shed["sampled_out"]
+
+
+class RemoteListener:
+    """Stands in for a listener running in the worker process."""
+
+    def __init__(self, pipeline, port, status_callback):
+        self.pipeline = pipeline
+        self.port = port
+        self.status_callback = status_callback
+        self.connected = False
+        self.messages_received = 0
+
+    def disconnect(self):
+        self.pipeline.send(("disconnect", self.port))
+        self.pipeline.listeners.pop(self.port, None)
+        self.connected = False
+
+    def retry_connection(self):
+        self.pipeline.send(("retry", self.port))
+
+
+class ViewerPipeline:
+    """Runs listening, decoding, dedupe and sanitizing in a worker process.
+
+    The worker owns the WebSocket listeners, the ingest queue and a
+    ViewerStore of its own. What reaches the GUI over the pipe is only new
+    rows with their display forms already derived, list resets, trend
+    samples and queue load; poll() bulk-loads the rows into the GUI's
+    store (no sanitizing) and notifies its consumers, so the Tk process is
+    left with little more than drawing.
+
+    listener() has create_listener()'s signature and the pipeline has
+    ResetFilter's expect methods, so BackendPool can use it for both.
+    """
+
+    def __init__(self, root, compiler, trends, maxsize=10000, policy=DROP_NEWEST):
+        self.root = root
+        self.compiler = compiler
+        self.trends = trends
+        self.maxsize = maxsize
+        self.queue = QueueStatus(policy)
+        self.listeners = {}  # port -> RemoteListener
+        self.process = None
+        self.conn = None
+        self._after_id = None
+
+    def start(self):
+        # spawn: a fork of the Tk process would inherit its interpreter state
+        context = multiprocessing.get_context("spawn")
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, self.maxsize, self.queue.policy),
+                                       name="stream-tool-worker", daemon=True)
+        self.process.start()
+        child.close()
+        store = self.compiler.store
+        if len(store):
+            # Restored from the journal: the worker has to dedupe against it
+            self.send(("load", store.names, store.platforms.tobytes(), store.sanitized, store.first_words,
+                       store.first_seen.tolist()))
+        self._after_id = self.root.after(POLL_MS, self.poll)
+
+    def send(self, message):
+        try:
+            self.conn.send(message)
+        except (OSError, AttributeError):
+            pass  # Not started or already stopped
+
+    def listener(self, port, message_callback=None, status_callback=None):
+        listener = self.listeners[port] = RemoteListener(self, port, status_callback)
+        self.send(("connect", port))
+        return listener
+
+    def expect(self, ports):
+        self.send(("expect_reset", list(ports)))
+
+    def expect_late(self, port):
+        self.send(("expect_late_reset", port))
+
+    def add(self, name, platform=""):
+        self.send(("add", name, platform))
+
+    def clear(self):
+        # The worker's clear comes back as a "clear" message, in order with its rows
+        self.send(("clear",))
+
+    def poll(self):
+        deadline = time.perf_counter() + POLL_BUDGET_SECONDS
+        try:
+            while self.conn.poll() and time.perf_counter() < deadline:
+                self.handle(self.conn.recv())
+        except (EOFError, OSError) as e:
+            print(f"Pipeline worker stopped: {e}")
+            self._after_id = None
+            return
+        self._after_id = self.root.after(POLL_MS, self.poll)
+
+    def handle(self, message):
+        kind = message[0]
+        if kind == "rows":
+            _, start, names, platforms, sanitized, first_words, first_seen = message
+            store = self.compiler.store
+            if start != len(store):
+                print(f"Pipeline out of step: rows from {start}, store has {len(store)}")
+            first_seen_column = array('d')
+            first_seen_column.frombytes(first_seen)
+            store.load(names, platforms, sanitized, first_words, first_seen_column)
+            stats.incr("viewers_accepted", len(names))
+            self.compiler.notify(start)
+        elif kind == "clear":
+            self.compiler.clear()
+        elif kind == "status":
+            _, port, status, color, connected = message
+            listener = self.listeners.get(port)
+            if listener:
+                listener.connected = connected
+                if listener.status_callback:
+                    listener.status_callback(status, color)
+        elif kind == "trends":
+            self.trends.record(*message[1:])
+        elif kind == "load":
+            _, depth, shed, shedding, received = message
+            queue = self.queue
+            queue.depth, queue.shed, queue.shedding = depth, shed, shedding
+            stats.gauge("queue_depth", depth)
+            stats.gauge("queue_dropped", queue.dropped)
+            stats.gauge("queue_coalesced", shed["coalesced"])
+            for port, count in received.items():
+                listener = self.listeners.get(port)
+                if listener and count > listener.messages_received:
+                    stats.incr("messages_received", count - listener.messages_received)
+                    listener.messages_received = count
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.send(("stop",))
+        if self.process:
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
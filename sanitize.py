@@ -0,0 +1,44 @@
+import unicodedata
+from functools import lru_cache
+
+# Size of the per-name memo; repeat chatters and re-renders hit it
+CACHE_SIZE = 65536
+
+
+class _CategoryTable(dict):
+    """str.translate table: letters and whitespace map to themselves,
+    everything else to a space. Code points are classified on first sight
+    and remembered, so unicodedata is consulted once per distinct character.
+    """
+
+    def __missing__(self, code_point):
+        c = chr(code_point)
+        value = c if unicodedata.category(c).startswith('L') or c.isspace() else ' '
+        self[code_point] = value
+        return value
+
+
+_TABLE = _CategoryTable()
+# Precompute Latin-1 and Latin Extended-A/B, by far the most common ranges
+for _code_point in range(0x250):
+    _TABLE[_code_point]
+del _code_point
+
+
+def _sanitize_uncached(name):
+    if not name.isascii():
+        # NFKC is the identity on ASCII, so only pay for it when needed
+        name = unicodedata.normalize('NFKC', name)
+    return ' '.join(name.translate(_TABLE).split())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def sanitize_name(name):
+    """NFKC-normalize name, replace anything that isn't a letter with a
+    space and collapse runs of whitespace."""
+    return _sanitize_uncached(name)
+
+
+def sanitize_names(names):
+    """Sanitize a sequence of names in one call."""
+    return list(map(sanitize_name, names))
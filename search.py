@@ -0,0 +1,232 @@
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from operator import attrgetter
+from compiler import ViewerConsumer
+from viewer_store import PLATFORM_CODES
+
+SEARCH_FIELDS = ("raw", "sanitized")
+PREFIX = "prefix"
+SUBSTRING = "substring"
+
+# Names per sealed chunk: big enough for str.find to run at C speed over
+# many names at once, small enough that scanning the open tail is cheap
+CHUNK_SIZE = 4096
+# Length of the n-grams in the substring postings. Shorter needles match
+# so many names that the newest chunks yield enough hits without them
+GRAM = 3
+
+
+def _successor(prefix):
+    """The least string above every string that starts with prefix, or
+    None when there is none."""
+    while prefix and ord(prefix[-1]) == sys.maxunicode:
+        prefix = prefix[:-1]
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+
+
+class _Haystack:
+    """One searchable form of every name, casefolded, CHUNK_SIZE rows to a
+    chunk: chunk i holds rows i * CHUNK_SIZE on.
+
+    A sealed chunk is newline-separated text plus the offset of each name
+    in it. index_next() then indexes the sealed chunks in order: the
+    chunk's name positions sorted by name, so a prefix is two bisections,
+    and its n-grams in postings that map each n-gram to a bitmap of the
+    chunks containing it. The newest rows wait in an open tail, scanned name by
+    name; a chunk not indexed yet is scanned with str.find.
+    """
+
+    def __init__(self):
+        self.chunks = []  # (text, offsets) of each sealed chunk
+        self.orders = []  # Sorted name positions of each indexed chunk
+        self.postings = {}  # n-gram -> bitmap of the indexed chunks containing it
+        self.tail = []
+
+    @property
+    def indexed(self):
+        return len(self.orders)
+
+    def append(self, text):
+        self.tail.append(text.casefold().replace("\n", " "))
+        if len(self.tail) >= CHUNK_SIZE:
+            self.chunks.append(self._seal(self.tail))
+            self.tail = []
+
+    @staticmethod
+    def _seal(names):
+        # offsets[i] is the position of the newline just before name i, and
+        # the last offset that of the final newline
+        offsets = array('L')
+        position = 0
+        for name in names:
+            offsets.append(position)
+            position += len(name) + 1
+        offsets.append(position)
+        return "\n" + "\n".join(names) + "\n", offsets
+
+    def index_next(self):
+        """Index the oldest sealed chunk not indexed yet; False if none is left."""
+        number = len(self.orders)
+        if number >= len(self.chunks):
+            return False
+        text, _ = self.chunks[number]
+        names = text[1:-1].split("\n")
+        self.orders.append(array('H', sorted(range(len(names)), key=names.__getitem__)))
+        postings = self.postings
+        bit = 1 << number
+        for gram in {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}:
+            postings[gram] = postings.get(gram, 0) | bit
+        return True
+
+    def candidates(self, needle):
+        """Bitmap of the indexed chunks that may contain needle, or None when
+        needle is too short for the postings to tell."""
+        if len(needle) < GRAM:
+            return None
+        chunks = -1
+        for i in range(len(needle) - GRAM + 1):
+            chunks &= self.postings.get(needle[i:i + GRAM], 0)
+        return chunks
+
+    def positions(self, number, needle, mode):
+        """Positions within chunk number of the names matching needle, in no
+        particular order. number may be the open tail's, len(chunks)."""
+        if number == len(self.chunks):
+            if mode == PREFIX:
+                return [i for i, name in enumerate(self.tail) if name.startswith(needle)]
+            return [i for i, name in enumerate(self.tail) if needle in name]
+
+        text, offsets = self.chunks[number]
+        if mode == PREFIX and number < len(self.orders):
+            order = self.orders[number]
+            upper = _successor(needle)
+            return order[self._bisect(text, offsets, order, needle):
+                         self._bisect(text, offsets, order, upper) if upper else len(order)]
+
+        if mode == PREFIX:
+            needle = "\n" + needle
+        found = []
+        find = text.find
+        position = find(needle)
+        while position != -1:
+            index = bisect_right(offsets, position) - 1
+            found.append(index)
+            position = find(needle, offsets[index + 1])
+        return found
+
+    @staticmethod
+    def _bisect(text, offsets, order, key):
+        # bisect_left over the chunk's names in sorted order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            i = order[middle]
+            if text[offsets[i] + 1:offsets[i + 1]] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+class ViewerSearch(ViewerConsumer):
+    """Indexed, case-insensitive search over a ViewerStore.
+
+    Follows the store as a consumer. Prefix and substring queries match the
+    raw and/or sanitized name and can be limited to one platform. Chunks
+    are searched newest first, so a query limited to its latest hits stops
+    as soon as it has them, however many names match. build_index() indexes
+    sealed chunks a slice at a time, meant to run while the UI is idle; until
+    then a chunk is still searched, just with a scan. A query that only
+    narrows the previous, complete one (more characters typed) re-checks
+    just the previous hits plus rows added since.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.clear()
+
+    def clear(self):
+        self.haystacks = {field: _Haystack() for field in SEARCH_FIELDS}
+        self.indexed = 0
+        self._last = None
+
+    def on_viewers(self, store, start):
+        self.store = store
+        raw, sanitized = self.haystacks["raw"], self.haystacks["sanitized"]
+        for row in range(max(start, self.indexed), len(store)):
+            raw.append(store.names[row])
+            sanitized.append(store.sanitized[row])
+        self.indexed = len(store)
+
+    def on_clear(self):
+        self.clear()
+
+    def build_index(self, budget=None):
+        """Index sealed chunks for about budget seconds (None: all of them),
+        one chunk at a time; returns whether any are left."""
+        deadline = None if budget is None else time.perf_counter() + budget
+        pending = [haystack for haystack in self.haystacks.values() if haystack.indexed < len(haystack.chunks)]
+        while pending:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return True
+            # Keep the fields level, so a chunk is indexed in all of them soon
+            min(pending, key=attrgetter("indexed")).index_next()
+            pending = [haystack for haystack in pending if haystack.indexed < len(haystack.chunks)]
+        return False
+
+    def search(self, query, mode=SUBSTRING, fields=SEARCH_FIELDS, platform=None, start=0, limit=None):
+        """Rows from start matching query, in arrival order; with limit,
+        only the latest limit of them."""
+        needle = query.casefold().replace("\n", " ")
+        if not needle:
+            return []
+        key = (mode, tuple(fields), platform)
+        last = self._last
+        if start == 0 and last and last[0] == key and self._narrows(last[1], needle, mode):
+            # Only the previous hits can still match; rows indexed since then are searched
+            rows = [row for row in last[2] if self._matches(row, needle, mode, fields)]
+            rows += self._find(needle, mode, fields, platform, last[3], limit)
+            if limit:
+                rows = rows[-limit:]
+        else:
+            rows = self._find(needle, mode, fields, platform, start, limit)
+        if start == 0:
+            # Only a complete hit list can be narrowed
+            self._last = (key, needle, rows, self.indexed) if not limit or len(rows) < limit else None
+        return rows
+
+    @staticmethod
+    def _narrows(previous, needle, mode):
+        return needle.startswith(previous) if mode == PREFIX else previous in needle
+
+    def _find(self, needle, mode, fields, platform, start, limit):
+        haystacks = [self.haystacks[field] for field in fields]
+        candidates = [None if mode == PREFIX else haystack.candidates(needle) for haystack in haystacks]
+        code = PLATFORM_CODES.get(platform, 0) if platform else None
+        platforms = self.store.platforms
+        found, count = [], 0
+        for number in range(self.indexed // CHUNK_SIZE, start // CHUNK_SIZE - 1, -1):
+            positions = set()
+            for haystack, chunks in zip(haystacks, candidates):
+                if chunks is None or number >= haystack.indexed or chunks >> number & 1:
+                    positions.update(haystack.positions(number, needle, mode))
+            first_row = number * CHUNK_SIZE
+            rows = [first_row + position for position in sorted(positions) if first_row + position >= start]
+            if code is not None:
+                rows = [row for row in rows if platforms[row] == code]
+            if rows:
+                found.append(rows)
+                count += len(rows)
+                if limit and count >= limit:
+                    break
+        rows = [row for rows in reversed(found) for row in rows]
+        return rows[-limit:] if limit else rows
+
+    def _matches(self, row, needle, mode, fields):
+        for field in fields:
+            text = (self.store.names if field == "raw" else self.store.sanitized)[row].casefold()
+            if text.startswith(needle) if mode == PREFIX else needle in text:
+                return True
+        return False
@@ -8,6 +8,8 @@ const app = express();
 const port = process.argv[2] || 8080; // Change default port to 8080
 
 let currentKeyword = '';
+let currentMatcher = null;  // Compiled once per keyword change, not per message
+let forwardChat = false;  // Also send every chat line as a 'chatMessage' event
 let viewersSet = new Set();
 let wsClient = null;
 
@@ -15,6 +17,8 @@ app.use(bodyParser.json());
 
 const server = app.listen(port, () => {
     console.log(`🚀 Server is running on http://localhost:${port}`);
+    // Readiness handshake read by gui.py; keep this line format stable
+    console.log(`STREAM_TOOL_READY ${server.address().port}`);
 });
 
 const shutdown = () => {
@@ -94,6 +98,37 @@ server.on('close', () => {
     clearInterval(interval);
 });
 
+// Events for the GUI are coalesced and sent once per event-loop turn, as a
+// JSON array when there is more than one, so the GUI parses once per batch.
+// Call flushEvents() before any direct wsClient.send to keep ordering.
+let pendingEvents = [];
+
+function sendEvent(event) {
+    if (!wsClient || wsClient.readyState !== WebSocket.OPEN) {
+        return;
+    }
+    pendingEvents.push(event);
+    if (pendingEvents.length === 1) {
+        setImmediate(flushEvents);
+    }
+}
+
+function flushEvents() {
+    if (pendingEvents.length === 0) {
+        return;
+    }
+    const events = pendingEvents;
+    pendingEvents = [];
+    if (wsClient && wsClient.readyState === WebSocket.OPEN) {
+        wsClient.send(JSON.stringify(events.length === 1 ? events[0] : events));
+    }
+}
+
+function setKeyword(keyword) {
+    currentKeyword = keyword || '';
+    currentMatcher = currentKeyword ? createKeywordMatcher(currentKeyword) : null;
+}
+
 function createKeywordMatcher(keyword) {
     const normalizeText = (text) => {
         return text.toLowerCase()
@@ -181,20 +216,22 @@ app.post('/start', async (req, res) => {
                 const text = data.comment || '';
                 console.log(`\x1b[32m[💬]\x1b[0m: ${user} \x1b[32m${text}\x1b[0m`);  // Darker green for TikTok
 
-                if (currentKeyword) {
-                    const matcher = createKeywordMatcher(currentKeyword);
+                if (forwardChat) {
+                    sendEvent({ type: 'chatMessage', viewerName: user, message: text, platform: 'tiktok' });
+                }
+
+                if (currentMatcher) {
+                    const matcher = currentMatcher;
                     if (matcher.test(text)) {
                         if (!viewersSet.has(user)) {
                             viewersSet.add(user);
-                            if (wsClient && wsClient.readyState === WebSocket.OPEN) {
-                                wsClient.send(JSON.stringify({
-                                    type: 'chat',
-                                    viewerName: user,
-                                    message: text,
-                                    platform: 'tiktok',
-                                    color: '#00b400'  // Dark green hex color
-                                }));
-                            }
+                            sendEvent({
+                                type: 'chat',
+                                viewerName: user,
+                                message: text,
+                                platform: 'tiktok',
+                                color: '#00b400'  // Dark green hex color
+                            });
                         }
                     }
                 }
@@ -212,13 +249,11 @@ app.post('/start', async (req, res) => {
                 const viewerCount = data?.viewerCount || 0;
                 
                 // Send viewer count update to GUI
-                if (wsClient && wsClient.readyState === WebSocket.OPEN) {
-                    wsClient.send(JSON.stringify({
-                        type: 'viewerCount',
-                        platform: 'tiktok',
-                        count: viewerCount
-                    }));
-                }
+                sendEvent({
+                    type: 'viewerCount',
+                    platform: 'tiktok',
+                    count: viewerCount
+                });
 
                 // Handle initial connection as soon as we get data
                 if (!responded) {
@@ -264,20 +299,22 @@ app.post('/start', async (req, res) => {
                 const user = tags['display-name'] || tags.username;
                 console.log(`\x1b[35m[💬]\x1b[0m ${user}: \x1b[35m${message}\x1b[0m`);  // Purple color for Twitch
 
-                if (currentKeyword) {
-                    const matcher = createKeywordMatcher(currentKeyword);
+                if (forwardChat) {
+                    sendEvent({ type: 'chatMessage', viewerName: user, message: message, platform: 'twitch' });
+                }
+
+                if (currentMatcher) {
+                    const matcher = currentMatcher;
                     if (matcher.test(message)) {
                         if (!viewersSet.has(user)) {
                             viewersSet.add(user);
-                            if (wsClient && wsClient.readyState === WebSocket.OPEN) {
-                                wsClient.send(JSON.stringify({
-                                    type: 'chat',
-                                    viewerName: user,
-                                    message: message,
-                                    platform: 'twitch',
-                                    color: '#9146ff'  // Twitch purple hex color
-                                }));
-                            }
+                            sendEvent({
+                                type: 'chat',
+                                viewerName: user,
+                                message: message,
+                                platform: 'twitch',
+                                color: '#9146ff'  // Twitch purple hex color
+                            });
                         }
                     }
                 }
@@ -296,11 +333,12 @@ app.post('/start', async (req, res) => {
 
 // Set keyword
 app.post('/keyword', (req, res) => {
-    currentKeyword = req.body.keyword?.trim();
+    setKeyword(req.body.keyword?.trim());
     viewersSet.clear();  // Clear the set when setting a new keyword
     console.log("🔑 Keyword set to:", currentKeyword);
     
     // Notify GUI to clear viewer list
+    flushEvents();
     if (wsClient && wsClient.readyState === WebSocket.OPEN) {
         wsClient.send(JSON.stringify({
             type: 'control',
@@ -311,13 +349,21 @@ app.post('/keyword', (req, res) => {
     return res.json({ success: true });
 });
 
+// Forward every chat line to the GUI, for client-side multi-keyword matching
+app.post('/forwardChat', (req, res) => {
+    forwardChat = Boolean(req.body?.enabled);
+    console.log('💬 Chat forwarding', forwardChat ? 'enabled' : 'disabled');
+    res.json({ success: true });
+});
+
 // Reset keyword endpoint
 app.post('/clearKeyword', (req, res) => {
-    currentKeyword = '';
+    setKeyword('');
     viewersSet.clear();
     console.log('🔑 Keyword cleared');
     
     // Send reset message to GUI
+    flushEvents();
     if (wsClient && wsClient.readyState === WebSocket.OPEN) {
         wsClient.send('clearViewers');
     }
@@ -340,13 +386,14 @@ app.post('/disconnect', async (req, res) => {
             twitchClient = null;
         }
         // Send a structured JSON message instead of plain text
+        flushEvents();
         if (wsClient && wsClient.readyState === WebSocket.OPEN) {
             wsClient.send(JSON.stringify({
                 type: 'control',
                 action: 'clearViewers'
             }));
         }
-        currentKeyword = '';
+        setKeyword('');
         viewersSet.clear();
     } else if (platform === 'tiktok' && tiktokConnection) {
         await tiktokConnection.disconnect();
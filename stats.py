@@ -0,0 +1,114 @@
+import json
+import time
+
+# Stage names used across the pipeline
+WS_RECEIVE = "ws_receive"  # Listener callback, decode + hand-off
+WS_DECODE = "ws_decode"  # Frame to events in WebSocketManager.on_message
+DEDUPE = "dedupe"  # Membership check against the store
+STORE = "store"  # Sanitize + append of new viewers
+RENDER = "render"  # Pushing new rows into the viewer list widget
+
+
+class Histogram:
+    """Fixed-size log2 histogram of durations.
+
+    Bucket i counts durations below 2**i microseconds (and at least
+    2**(i-1)), so percentiles are accurate to within a factor of two.
+    """
+
+    BUCKETS = 32  # Tops out around 35 minutes
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        bucket = min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the bucket holding the percentile."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1e3,
+            "p99_ms": self.percentile(0.99) * 1e3,
+            "max_ms": self.max * 1e3,
+        }
+
+
+class Stats:
+    """Counters, gauges and per-stage timing histograms for the hot path.
+
+    Updated without locking from the listener and Tk threads; an increment
+    lost to a thread switch is an acceptable price for keeping this cheap.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.counters = {}
+        self.gauges = {}
+        self.stages = {}
+        self._last_counters = {}
+        self._last_rate_time = self.started
+
+    def incr(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def observe(self, stage, seconds):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def rates(self):
+        """Per-second counter rates since the previous call."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_rate_time, 1e-9)
+        counters = dict(self.counters)
+        rates = {name: (value - self._last_counters.get(name, 0)) / elapsed
+                 for name, value in counters.items()}
+        self._last_counters = counters
+        self._last_rate_time = now
+        return rates
+
+    def snapshot(self):
+        return {
+            "time": time.time(),
+            "uptime_s": time.monotonic() - self.started,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "stages": {stage: h.snapshot() for stage, h in list(self.stages.items())},
+        }
+
+    def append_snapshot(self, path):
+        """Append one snapshot as an NDJSON line for offline analysis."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.snapshot()) + "\n")
+
+
+# Shared by the listener, compiler and GUI unless they are handed their own
+stats = Stats()
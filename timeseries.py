@@ -0,0 +1,157 @@
+import csv
+import time
+from collections import deque
+
+# (seconds per point, points kept): 10 minutes at 1s, 2 hours at 10s, 24 hours
+# at 1 minute. Memory is fixed at their sum, however long the stream runs.
+DEFAULT_LEVELS = ((1, 600), (10, 720), (60, 1440))
+
+
+class _Level:
+    """One resolution: a window of the last size buckets."""
+    __slots__ = ("resolution", "size", "points", "bucket", "total", "count")
+
+    def __init__(self, resolution, size):
+        self.resolution = resolution
+        self.size = size
+        self.points = deque(maxlen=size)  # (bucket start time, total, count)
+        self.bucket = None
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, value, now):
+        bucket = int(now // self.resolution)
+        if bucket != self.bucket:
+            self.close()
+            self.bucket = bucket
+        self.total += value
+        self.count += 1
+
+    def window_start(self):
+        """Start time of the oldest bucket still in the window, or None."""
+        latest = self.bucket if self.bucket is not None else (
+            int(self.points[-1][0] // self.resolution) if self.points else None)
+        return None if latest is None else (latest - self.size + 1) * self.resolution
+
+    def close(self):
+        if self.bucket is not None and self.count:
+            self.points.append((self.bucket * self.resolution, self.total, self.count))
+        self.bucket = None
+        self.total = 0.0
+        self.count = 0
+
+    def all_points(self):
+        start = self.window_start()
+        points = [point for point in self.points if point[0] >= start] if self.points else []
+        if self.bucket is not None and self.count:
+            points.append((self.bucket * self.resolution, self.total, self.count))
+        return points
+
+
+class TimeSeries:
+    """Fixed-memory time series with automatic downsampling.
+
+    Every sample goes into each level, a ring buffer of buckets at its own
+    resolution, so recent history is kept at full detail and older history
+    only in the coarser levels. A "mean" series averages the samples of a
+    bucket (gauges such as viewer counts); a "rate" series sums them and
+    divides by the bucket length (events per second, empty buckets 0).
+    """
+
+    def __init__(self, kind="mean", levels=DEFAULT_LEVELS):
+        self.kind = kind
+        self.levels = [_Level(resolution, size) for resolution, size in levels]
+
+    def record(self, value, now=None):
+        now = time.time() if now is None else now
+        for level in self.levels:
+            level.record(value, now)
+
+    def points(self, since=None):
+        """(time, value) pairs, oldest first, each span taken from the finest
+        level that still covers it."""
+        merged = []
+        covered_from = float("inf")
+        for level in self.levels:
+            points = level.all_points()
+            older = [p for p in points if p[0] + level.resolution <= covered_from]
+            if points:
+                covered_from = min(covered_from, level.window_start())
+            merged[:0] = [(start, self._value(total, count, level.resolution), level.resolution)
+                          for start, total, count in older]
+        if self.kind == "rate":
+            merged = self._fill_gaps(merged)
+        return [(start, value) for start, value, _ in merged if since is None or start >= since]
+
+    def _value(self, total, count, resolution):
+        return total / resolution if self.kind == "rate" else total / count
+
+    @staticmethod
+    def _fill_gaps(points):
+        # Rate buckets with no events were never created; they are zeros.
+        # Only gaps within one level are filled, not the seam between levels
+        filled = []
+        for start, value, resolution in points:
+            if filled and filled[-1][2] == resolution:
+                gap_start = filled[-1][0] + filled[-1][2]
+                while gap_start < start:
+                    filled.append((gap_start, 0.0, resolution))
+                    gap_start += resolution
+            filled.append((start, value, resolution))
+        return filled
+
+    def latest(self):
+        points = self.levels[0].all_points()
+        if not points:
+            return None
+        return self._value(points[-1][1], points[-1][2], self.levels[0].resolution)
+
+
+class StreamTrends:
+    """Viewer count and keyword-hit rate per platform, from listener events.
+
+    Feed it every event batch; viewerCount events become a "viewers" series
+    and chat events a "hits" rate series, one of each per platform.
+    """
+
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self.levels = levels
+        self.series = {}  # (metric, platform) -> TimeSeries
+
+    def get(self, metric, platform):
+        key = (metric, platform)
+        if key not in self.series:
+            self.series[key] = TimeSeries("rate" if metric == "hits" else "mean", self.levels)
+        return self.series[key]
+
+    def handle_batch(self, events, now=None):
+        self.record(*self.summarize(events), now)
+
+    @staticmethod
+    def summarize(events):
+        """(hits per platform, [(platform, viewer count)]) of a batch."""
+        hits = {}
+        counts = []
+        for event in events:
+            if event.type == "chat":
+                hits[event.platform] = hits.get(event.platform, 0) + 1
+            elif event.type == "viewerCount":
+                counts.append((event.platform, event.count))
+        return hits, counts
+
+    def record(self, hits, counts, now=None):
+        now = time.time() if now is None else now
+        for platform, count in counts:
+            self.get("viewers", platform).record(count, now)
+        for platform, count in hits.items():
+            self.get("hits", platform).record(count, now)
+
+    def clear(self):
+        self.series = {}
+
+    def export_csv(self, out):
+        writer = csv.writer(out)
+        writer.writerow(["metric", "platform", "time", "value"])
+        for (metric, platform), series in sorted(self.series.items()):
+            writer.writerows((metric, platform, f"{start:.0f}", f"{value:.3f}")
+                             for start, value in series.points())
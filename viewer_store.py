@@ -0,0 +1,193 @@
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from sanitize import sanitize_name
+
+# Platform codes stored in the platform column; index 0 is "unknown"
+PLATFORMS = ("", "tiktok", "twitch")
+PLATFORM_CODES = {name: code for code, name in enumerate(PLATFORMS)}
+
+# Forms a viewer list can be deduped by, and the column each one displays.
+# "raw" is the store's own key; the others have an index of their own.
+MODE_COLUMNS = {"raw": "names", "sanitized": "sanitized", "first_word": "first_words", "casefold": "names"}
+INDEXED_MODES = ("sanitized", "first_word", "casefold")
+
+# Every display form of a viewer, computed once when the name is accepted
+ViewerRecord = namedtuple("ViewerRecord", ["name", "platform", "sanitized", "first_word", "first_seen"])
+
+
+class ViewerStore:
+    """Deduplicated viewers in arrival order, stored column by column.
+
+    Names and their derived forms are interned str columns, the platform is
+    one byte in an array('B'), and a set of the raw names gives O(1)
+    membership. first_seen holds each viewer's acceptance time (Unix
+    seconds) in an array('d'). clear() just swaps in fresh columns.
+
+    Each other dedupe mode (sanitized, first word, case-folded name) keeps
+    its own dict of forms seen so far plus an array('L') of the rows that
+    introduced a new form, updated as viewers are added. Any mode's unique
+    list is then a read of that array and its count is a len(). A mode's
+    index is only built the first time the mode is asked for, so a bulk
+    load (journal replay) and a session that never leaves raw don't pay
+    for it.
+
+    Measured with benchmarks/bench_store.py (CPython 3.11, 64-bit), a viewer
+    costs about 240 bytes beyond its raw name string with every mode
+    indexed. The columns and raw index take about 110: an 8-byte pointer in
+    each of the three str columns, one platform byte, an 8-byte first_seen
+    double and the index's set entry and slack. The rest goes to the mode
+    indexes, about 50 bytes per built index in which the viewer's form is
+    new. Derived strings only add to that when they differ from an existing
+    string; interning shares the rest.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.names = []
+        self.sanitized = []
+        self.first_words = []
+        self.platforms = array('B')
+        self.first_seen = array('d')
+        self.index = set()
+        # Only the modes asked for so far; see _mode_index()
+        self.form_index = {}
+        self.unique_rows = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def add(self, name, platform, first_seen=None):
+        """Store a new viewer; returns its row, or None if already present."""
+        if name in self.index:
+            return None
+        name = sys.intern(name)
+        cleaned = sanitize_name(name)
+        row = len(self.names)
+        self.index.add(name)
+        self.names.append(name)
+        self.sanitized.append(sys.intern(cleaned.capitalize()))
+        self.first_words.append(sys.intern(cleaned.split()[0].capitalize()) if cleaned else "")
+        self.platforms.append(PLATFORM_CODES.get(platform, 0))
+        self.first_seen.append(time.time() if first_seen is None else first_seen)
+        for mode, index in self.form_index.items():
+            form = self._form(mode, row)
+            if form and form not in index:
+                index[form] = row
+                self.unique_rows[mode].append(row)
+        return row
+
+    def load(self, names, platforms, sanitized, first_words, first_seen):
+        """Append already-derived rows in bulk (journal replay); names
+        already present are skipped. platforms is a bytes-like of codes,
+        first_seen an iterable of floats.
+
+        Only first words are interned here: they repeat heavily, while
+        interning every unique name would double the cost of a replay.
+        """
+        intern = sys.intern
+        start = len(self.names)
+        index = None if self.names else set(names)
+        if index is not None and len(index) == len(names):
+            # Fresh store and no repeats: take the columns whole
+            self.index = index
+            self.names = list(names)
+            self.sanitized = list(sanitized)
+            self.first_words = list(map(intern, first_words))
+            self.platforms = array('B', platforms)
+            self.first_seen = array('d', first_seen)
+        else:
+            for name, platform, cleaned, first, seen in zip(names, platforms, sanitized, first_words, first_seen):
+                if name in self.index:
+                    continue
+                self.index.add(name)
+                self.names.append(name)
+                self.sanitized.append(cleaned)
+                self.first_words.append(intern(first))
+                self.platforms.append(platform)
+                self.first_seen.append(seen)
+        # Modes shown so far keep their index; the rest build theirs when asked
+        for mode in self.form_index:
+            self._index_forms(mode, start)
+
+    def _form(self, mode, row):
+        if mode == "sanitized":
+            return self.sanitized[row]
+        if mode == "first_word":
+            return self.first_words[row]
+        return self.names[row].casefold()
+
+    def _mode_index(self, mode):
+        """mode's form dict, built over every row the first time it's asked for."""
+        if mode not in self.form_index:
+            self.form_index[mode] = {}
+            self.unique_rows[mode] = array('L')
+            self._index_forms(mode, 0)
+        return self.form_index[mode]
+
+    def _index_forms(self, mode, start):
+        # Bulk version of add()'s indexing for rows from start. Building a
+        # dict from the reversed rows leaves each form mapped to its first
+        # row, all at C speed
+        stop = len(self.names)
+        if mode == "casefold":
+            forms = list(map(str.casefold, self.names[start:]))
+        else:
+            forms = self.texts(mode)[start:]
+        index = self.form_index[mode]
+        first_rows = dict(zip(reversed(forms), range(stop - 1, start - 1, -1)))
+        first_rows.pop("", None)
+        if index:
+            first_rows = {form: row for form, row in first_rows.items() if form not in index}
+        index.update(first_rows)
+        self.unique_rows[mode].extend(sorted(first_rows.values()))
+
+    def mode_rows(self, mode):
+        """The rows that are the first with their form under mode, as the
+        store's own array (a range for raw); it only grows until clear()."""
+        if mode == "raw":
+            return range(len(self.names))
+        self._mode_index(mode)
+        return self.unique_rows[mode]
+
+    def unique_count(self, mode="raw"):
+        """Number of distinct viewers under mode, in O(1)."""
+        if mode == "raw":
+            return len(self.names)
+        return len(self.mode_rows(mode))
+
+    def unique_rows_from(self, mode, start=0):
+        """Rows from start on that are the first with their form under mode."""
+        if mode == "raw":
+            return range(start, len(self.names))
+        rows = self.mode_rows(mode)
+        return rows[bisect_left(rows, start):]
+
+    def is_unique(self, mode, row):
+        """Whether row is the first with its form under mode, in O(1)."""
+        if mode == "raw":
+            return row < len(self.names)
+        form = self._form(mode, row)
+        return bool(form) and self._mode_index(mode).get(form) == row
+
+    def texts(self, mode):
+        """The column mode displays."""
+        return getattr(self, MODE_COLUMNS[mode])
+
+    def platform(self, row):
+        return PLATFORMS[self.platforms[row]]
+
+    def record(self, row):
+        return ViewerRecord(self.names[row], self.platform(row), self.sanitized[row], self.first_words[row],
+                            self.first_seen[row])
+
+    def records(self, start=0, stop=None):
+        for row in range(start, len(self.names) if stop is None else stop):
+            yield self.record(row)